@@ -0,0 +1,318 @@
+import time
+import random
+import asyncio
+import threading
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+from capture import CapturedFrame
+from mjpeg_streamer import MJPEGParser, parse_boundary, REDUCED_DECODE_FLAGS
+
+
+class AsyncStream:
+    """
+    One MJPEG source read by AsyncIngest. It has the same read()/read_new()/isOpened()/release()
+    surface as MJPEGStreamer, so it can replace one in main.py's loop.
+
+    Only the newest encoded JPEG is kept; frames are decoded when someone asks for them.
+    Frames older than max_age are never returned: read() reports failure while the
+    camera is stalled instead of returning a stale image.
+    """
+    def __init__(self, ingest, url, name, max_age=0.5, reduce=1):
+        self.ingest = ingest
+        self.url = url
+        self.name = name
+        self.max_age = max_age
+        self.reduce = reduce
+        self.jpeg = None
+        self.jpeg_seq = 0
+        self.jpeg_time = 0.0
+        self.frame = None
+        self.frame_seq = 0
+        self.busy = False # A worker is processing this stream
+        self.connected = False
+        self.stopped = False
+        self.received = 0
+        self.decoded = 0
+        self.skipped = 0 # Replaced before being decoded
+        self.stale = 0 # Dropped for exceeding max_age
+        self.reconnects = 0
+        self.lock = threading.Lock()
+        self.new_frame = threading.Condition(self.lock)
+
+    def _on_jpegs(self, jpegs):
+        """Called on the event loop with the complete JPEGs from one read."""
+        with self.new_frame:
+            self.skipped += len(jpegs) - 1
+            if self.jpeg is not None and self.frame_seq != self.jpeg_seq:
+                self.skipped += 1
+            self.jpeg = jpegs[-1]
+            self.jpeg_seq += len(jpegs)
+            self.jpeg_time = time.perf_counter()
+            self.received += len(jpegs)
+            self.new_frame.notify_all()
+
+    def _take(self):
+        """Claim the newest undelivered JPEG. Call with the lock held. Returns (jpeg, seq, time) or None."""
+        if self.jpeg_seq <= self.frame_seq:
+            return None
+        self.frame_seq = self.jpeg_seq
+        if time.perf_counter() - self.jpeg_time > self.max_age:
+            self.stale += 1
+            return None
+        return self.jpeg, self.jpeg_seq, self.jpeg_time
+
+    def _decode(self, jpeg):
+        img = cv2.imdecode(np.frombuffer(jpeg, dtype=np.uint8), REDUCED_DECODE_FLAGS[self.reduce])
+        self.decoded += 1
+        return img
+
+    def read_new(self, timeout=1.0):
+        """
+        Wait for a fresh frame newer than the last one returned and hand it over without copying.
+
+        Returns:
+            CapturedFrame: The frame, or None on timeout.
+        """
+        deadline = time.perf_counter() + timeout
+        with self.new_frame:
+            while True:
+                taken = self._take()
+                if taken is not None or self.stopped:
+                    break
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0 or not self.new_frame.wait(remaining):
+                    return None
+        if taken is None:
+            return None
+        jpeg, seq, timestamp = taken
+        img = self._decode(jpeg)
+        if img is None:
+            return None
+        self.frame = img
+        return CapturedFrame(seq, timestamp, img)
+
+    def read(self):
+        """Returns the latest frame (a copy) and a success boolean; fails while the stream is stale."""
+        with self.lock:
+            if time.perf_counter() - self.jpeg_time > self.max_age:
+                return False, None
+            taken = self._take()
+        if taken is not None:
+            img = self._decode(taken[0])
+            if img is not None:
+                self.frame = img
+        if self.frame is None:
+            return False, None
+        return True, self.frame.copy()
+
+    def stats(self):
+        with self.lock:
+            return {"received": self.received, "decoded": self.decoded, "skipped": self.skipped,
+                    "stale": self.stale, "reconnects": self.reconnects, "connected": self.connected}
+
+    def isOpened(self):
+        return not self.stopped
+
+    def is_opened(self):
+        return self.isOpened()
+
+    def release(self):
+        self.ingest.remove_stream(self)
+
+
+class AsyncIngest:
+    """
+    Reads many MJPEG HTTP streams on a single asyncio event loop thread.
+
+    Each stream reconnects with exponential backoff when it fails or stalls. If
+    on_frame is given, fresh frames are decoded on a thread pool and passed to
+    on_frame(stream, frame), with at most one frame per stream in flight. A
+    stream whose worker is busy simply keeps its newest frame.
+    """
+    def __init__(self, on_frame=None, workers=4, read_size=16384, connect_timeout=5.0,
+                 stall_timeout=5.0, backoff=0.5, max_backoff=10.0):
+        """
+        Args:
+            on_frame (callable): Optional on_frame(stream, CapturedFrame), run on the worker pool.
+            workers (int): Worker threads for decoding and on_frame.
+            read_size (int): Bytes requested per socket read.
+            stall_timeout (float): Reconnect if no data arrives for this many seconds.
+            backoff, max_backoff (float): First and largest delay between reconnect attempts.
+        """
+        self.on_frame = on_frame
+        self.read_size = read_size
+        self.connect_timeout = connect_timeout
+        self.stall_timeout = stall_timeout
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.streams = {}
+        self.tasks = {}
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ingest") if on_frame else None
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name="ingest-loop")
+        self.thread.daemon = True
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def add_stream(self, url, name=None, max_age=0.5, reduce=1):
+        """
+        Start reading a stream.
+
+        Args:
+            max_age (float): Frames older than this (seconds) are dropped.
+            reduce (int): Decode at 1/reduce resolution (1, 2, 4 or 8).
+
+        Returns:
+            AsyncStream: Handle with read()/read_new()/isOpened()/release().
+        """
+        stream = AsyncStream(self, url, name or url, max_age=max_age, reduce=reduce)
+        self.streams[stream.name] = stream
+        self.tasks[stream.name] = asyncio.run_coroutine_threadsafe(self._run_stream(stream), self.loop)
+        return stream
+
+    def remove_stream(self, stream):
+        with stream.new_frame:
+            stream.stopped = True
+            stream.new_frame.notify_all()
+        task = self.tasks.pop(stream.name, None)
+        if task:
+            task.cancel()
+        self.streams.pop(stream.name, None)
+
+    def stop(self):
+        for stream in list(self.streams.values()):
+            self.remove_stream(stream)
+
+        async def shutdown():
+            # Let cancelled readers unwind (and close their sockets) before the loop stops
+            tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+            for t in tasks:
+                t.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        if self.thread.is_alive():
+            try:
+                asyncio.run_coroutine_threadsafe(shutdown(), self.loop).result(timeout=2)
+            except Exception:
+                pass
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.thread.join(timeout=1)
+        if self.pool:
+            self.pool.shutdown(wait=False)
+
+    async def _run_stream(self, stream):
+        failures = 0
+        while not stream.stopped:
+            received = stream.received
+            try:
+                await self._read_stream(stream)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"[{stream.name}] stream error: {e}")
+            stream.connected = False
+            if stream.stopped:
+                break
+
+            # Exponential backoff with jitter, reset once a connection delivered frames
+            failures = 0 if stream.received > received else failures + 1
+            delay = min(self.max_backoff, self.backoff * (2 ** failures)) * random.uniform(0.5, 1.0)
+            stream.reconnects += 1
+            print(f"[{stream.name}] reconnecting in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+    async def _read_stream(self, stream):
+        url = urllib.parse.urlsplit(stream.url)
+        port = url.port or (443 if url.scheme == "https" else 80)
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(url.hostname, port, ssl=True if url.scheme == "https" else None),
+            self.connect_timeout)
+        try:
+            path = (url.path or "/") + (f"?{url.query}" if url.query else "")
+            writer.write(f"GET {path} HTTP/1.1\r\nHost: {url.netloc}\r\nUser-Agent: sign2speech\r\n"
+                         f"Accept: multipart/x-mixed-replace\r\nConnection: close\r\n\r\n".encode())
+            await writer.drain()
+
+            head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), self.connect_timeout)
+            lines = head.decode("latin-1").split("\r\n")
+            status = lines[0].split()
+            if len(status) < 2 or status[1] != "200":
+                raise ConnectionError(f"HTTP status {lines[0]!r}")
+            headers = {}
+            for line in lines[1:]:
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+
+            stream.connected = True
+            print(f"[{stream.name}] connected to {stream.url}")
+            parser = MJPEGParser(parse_boundary(headers.get("content-type")))
+            if "chunked" in headers.get("transfer-encoding", "").lower():
+                body = self._chunked_body(reader)
+            else:
+                body = self._plain_body(reader)
+
+            async for data in body:
+                if stream.stopped:
+                    return
+                jpegs = parser.feed(data)
+                if jpegs:
+                    stream._on_jpegs(jpegs)
+                    self._dispatch(stream)
+        finally:
+            writer.close()
+
+    async def _read(self, reader, size):
+        data = await asyncio.wait_for(reader.read(size), self.stall_timeout)
+        if not data:
+            raise ConnectionError("connection closed")
+        return data
+
+    async def _plain_body(self, reader):
+        while True:
+            yield await self._read(reader, self.read_size)
+
+    async def _chunked_body(self, reader):
+        """Transfer-Encoding: chunked, as sent by the ESP32 camera web server."""
+        while True:
+            line = await asyncio.wait_for(reader.readline(), self.stall_timeout)
+            size = int(line.split(b";")[0].strip() or b"0", 16)
+            if size == 0:
+                raise ConnectionError("stream ended")
+            while size > 0:
+                data = await self._read(reader, min(size, self.read_size))
+                size -= len(data)
+                yield data
+            await reader.readexactly(2) # CRLF after each chunk
+
+    def _dispatch(self, stream):
+        if self.pool is None:
+            return
+        with stream.lock:
+            if stream.busy:
+                return
+            stream.busy = True
+        self.pool.submit(self._work, stream)
+
+    def _work(self, stream):
+        """Worker: decode and process the stream's newest fresh frame until it has nothing new."""
+        while True:
+            with stream.lock:
+                taken = stream._take()
+                if taken is None:
+                    stream.busy = False
+                    return
+            jpeg, seq, timestamp = taken
+            img = stream._decode(jpeg)
+            if img is None:
+                continue
+            stream.frame = img
+            try:
+                self.on_frame(stream, CapturedFrame(seq, timestamp, img))
+            except Exception as e:
+                print(f"[{stream.name}] frame handler error: {e}")
@@ -0,0 +1,175 @@
+import os
+import wave
+import shutil
+import hashlib
+import argparse
+import threading
+import subprocess
+import collections
+
+# simpleaudio plays from memory; without it cached clips are played with aplay
+try:
+    import simpleaudio
+except ImportError:
+    simpleaudio = None
+
+AUDIO_CACHE_DIR = os.path.join(os.environ.get("XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache")),
+                               "sign2speech", "speech")
+
+# One rendered clip, decoded from its WAV file
+Clip = collections.namedtuple("Clip", ["frames", "channels", "sample_width", "sample_rate", "path"])
+
+
+def load_vocabulary(label_path="labels.txt"):
+    """Read the words the recognizer can produce, one per line."""
+    if not os.path.exists(label_path):
+        return []
+    with open(label_path, "r") as f:
+        return [line.strip() for line in f if line.strip()]
+
+def cache_key(text, voice, rate):
+    """Clips depend on the text and the voice settings used to render them."""
+    return hashlib.sha1(f"{text}\0{voice}\0{rate}".encode("utf-8")).hexdigest()[:20]
+
+
+class AudioCache:
+    """
+    Pre-rendered speech for a small vocabulary.
+
+    Words are rendered once with pyttsx3's save_to_file() into WAV files keyed by
+    text, voice and rate, and played back from memory instead of being synthesized
+    again. The cache holds at most max_entries clips (in memory and on disk); the
+    least recently played one is evicted when a new word is added.
+    """
+    def __init__(self, cache_dir=AUDIO_CACHE_DIR, max_entries=64):
+        """
+        Args:
+            cache_dir (str): Directory for the rendered WAV files.
+            max_entries (int): Largest number of cached clips.
+        """
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.clips = collections.OrderedDict() # key -> Clip, least recently used first
+        self.player = None # Current simpleaudio PlayObject or aplay process
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def can_play():
+        """True if cached clips can be played on this host."""
+        return simpleaudio is not None or shutil.which("aplay") is not None
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + ".wav")
+
+    def render(self, engine, texts, voice, rate):
+        """
+        Render the missing texts with the given pyttsx3 engine and load every clip.
+        Must be called from the thread that owns the engine.
+
+        Returns:
+            int: Number of clips rendered now (the rest came from disk).
+        """
+        pending = []
+        for text in texts:
+            path = self._path(cache_key(text, voice, rate))
+            if not os.path.exists(path):
+                engine.save_to_file(text, path)
+                pending.append(path)
+        if pending:
+            engine.runAndWait()
+        for text in texts:
+            self._load(cache_key(text, voice, rate))
+        return len(pending)
+
+    def _load(self, key):
+        path = self._path(key)
+        try:
+            with wave.open(path, "rb") as w:
+                clip = Clip(w.readframes(w.getnframes()), w.getnchannels(), w.getsampwidth(), w.getframerate(), path)
+        except (OSError, EOFError, wave.Error) as e:
+            print(f"Audio cache: could not load {path}: {e}")
+            return None
+        if not clip.frames:
+            return None
+        self.clips[key] = clip
+        self.clips.move_to_end(key)
+        while len(self.clips) > self.max_entries:
+            _, old = self.clips.popitem(last=False)
+            self.evictions += 1
+            try:
+                os.remove(old.path)
+            except OSError:
+                pass
+        return clip
+
+    def get(self, text, voice, rate):
+        """
+        Returns:
+            Clip: The cached clip, or None if the text has not been rendered.
+        """
+        key = cache_key(text, voice, rate)
+        clip = self.clips.get(key)
+        if clip is None:
+            self.misses += 1
+            return None
+        self.clips.move_to_end(key)
+        self.hits += 1
+        return clip
+
+    def play(self, clip):
+        """
+        Play a clip and block until it finishes or stop() is called.
+
+        Returns:
+            bool: False if no playback backend is available.
+        """
+        with self.lock:
+            if simpleaudio is not None:
+                self.player = simpleaudio.play_buffer(clip.frames, clip.channels, clip.sample_width, clip.sample_rate)
+            elif shutil.which("aplay"):
+                self.player = subprocess.Popen(["aplay", "-q", clip.path],
+                                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            else:
+                return False
+            player = self.player
+        if simpleaudio is not None:
+            player.wait_done()
+        else:
+            player.wait()
+        with self.lock:
+            self.player = None
+        return True
+
+    def stop(self):
+        """Interrupt the clip being played, if any."""
+        with self.lock:
+            if self.player is None:
+                return
+            if simpleaudio is not None:
+                self.player.stop()
+            else:
+                self.player.terminate()
+
+    def stats(self):
+        return {"clips": len(self.clips), "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+
+if __name__ == "__main__":
+    # Build step, e.g. in setup_rpi.sh: render the vocabulary so the first run doesn't have to
+    parser = argparse.ArgumentParser(description="Pre-render the vocabulary for SpeechEngine's audio cache")
+    parser.add_argument("--labels", type=str, default="labels.txt")
+    parser.add_argument("--rate", type=int, default=150)
+    parser.add_argument("--cache-dir", type=str, default=AUDIO_CACHE_DIR)
+    args = parser.parse_args()
+
+    import pyttsx3
+    engine = pyttsx3.init()
+    engine.setProperty('rate', args.rate)
+    words = load_vocabulary(args.labels)
+    cache = AudioCache(args.cache_dir, max_entries=max(64, len(words)))
+    rendered = cache.render(engine, words, engine.getProperty('voice'), args.rate)
+    print(f"{len(words)} words cached in {args.cache_dir} ({rendered} rendered now)")
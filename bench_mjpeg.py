@@ -0,0 +1,94 @@
+import time
+import argparse
+
+import cv2
+import numpy as np
+
+from mjpeg_streamer import MJPEGParser
+
+
+def legacy_parse(chunks):
+    """The bytes-concatenation parser MJPEGStreamer used before MJPEGParser, kept as the baseline."""
+    frames = []
+    bytes_buffer = bytes()
+    for chunk in chunks:
+        bytes_buffer += chunk
+        while True:
+            a = bytes_buffer.find(b'\xff\xd8')
+            if a == -1:
+                break
+            b = bytes_buffer.find(b'\xff\xd9', a)
+            if b == -1:
+                break
+            frames.append(bytes_buffer[a:b+2])
+            bytes_buffer = bytes_buffer[b+2:]
+    return frames
+
+def parser_parse(chunks, boundary):
+    parser = MJPEGParser(boundary)
+    frames = []
+    for chunk in chunks:
+        frames.extend(parser.feed(chunk))
+    return frames
+
+def make_stream(width, height, count, quality, content_length=True):
+    """
+    Build a multipart body framed like mock_server.py: '--frame', part headers,
+    the JPEG and a trailing CRLF. Noise keeps the JPEGs realistically large.
+
+    Returns:
+        tuple: (stream bytes, list of the JPEGs it contains)
+    """
+    rng = np.random.default_rng(0)
+    base = rng.integers(0, 255, (height, width, 3), dtype=np.uint8)
+    base = cv2.GaussianBlur(base, (0, 0), 3)
+    jpegs, parts = [], []
+    for i in range(count):
+        frame = base.copy()
+        x = (i * 37) % max(width - 100, 1)
+        cv2.rectangle(frame, (x, height // 3), (x + 100, height // 3 + 100), (0, 255, 0), -1)
+        _, jpeg = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+        jpeg = jpeg.tobytes()
+        jpegs.append(jpeg)
+        headers = b'--frame\r\nContent-Type: image/jpeg\r\n'
+        if content_length:
+            headers += b'Content-Length: ' + str(len(jpeg)).encode() + b'\r\n'
+        parts.append(headers + b'\r\n' + jpeg + b'\r\n')
+    parts.append(b'--frame--\r\n') # Closing delimiter, so the last part is complete without Content-Length
+    return b''.join(parts), jpegs
+
+def chunked(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+def measure(name, parse, chunks, expected, total_bytes, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        frames = parse(chunks)
+        best = min(best, time.perf_counter() - start)
+    ok = frames == expected
+    print(f"{name:<36} {total_bytes / best / 1e6:>9.1f} {len(frames) / best:>10.0f} {'ok' if ok else 'MISMATCH':>9}")
+
+def main():
+    parser = argparse.ArgumentParser(description="MJPEG parsing throughput: legacy bytes buffer vs MJPEGParser (no JPEG decoding)")
+    parser.add_argument("--width", type=int, default=1600)
+    parser.add_argument("--height", type=int, default=1200)
+    parser.add_argument("--frames", type=int, default=60)
+    parser.add_argument("--quality", type=int, default=90)
+    parser.add_argument("--read-size", type=int, nargs="+", default=[1024, 16384, 65536], help="Chunk sizes to test")
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    for content_length in (True, False):
+        data, jpegs = make_stream(args.width, args.height, args.frames, args.quality, content_length)
+        print(f"\n{args.frames} frames at {args.width}x{args.height}, {len(data) / len(jpegs) / 1024:.0f} KB/frame, "
+              f"Content-Length {'present' if content_length else 'absent'}")
+        print(f"{'parser':<36} {'MB/s':>9} {'frames/s':>10} {'output':>9}")
+        for size in args.read_size:
+            chunks = chunked(data, size)
+            measure(f"legacy bytes, read {size}", legacy_parse, chunks, jpegs, len(data), args.repeats)
+            measure(f"MJPEGParser boundary, read {size}", lambda c: parser_parse(c, "frame"), chunks, jpegs, len(data), args.repeats)
+            measure(f"MJPEGParser markers, read {size}", lambda c: parser_parse(c, None), chunks, jpegs, len(data), args.repeats)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+import os
+import glob
+import time
+import argparse
+
+import numpy as np
+
+from gesture_recognizer import GestureRecognizer
+from model_loader import ModelLoader
+from check_streaming import training_window
+
+PROCESSED_PATH = os.path.join("data", "processed")
+RAW_PATH = os.path.join("data", "raw")
+
+def load_windows(sequence_length):
+    """Labelled 30-frame windows from data/processed, cut as in training."""
+    paths = sorted(glob.glob(os.path.join(PROCESSED_PATH, "*", "*.npy")))
+    windows = np.stack([training_window(np.load(p), sequence_length) for p in paths])
+    labels = [os.path.basename(os.path.dirname(p)) for p in paths]
+    return windows, labels
+
+def time_invoke(run, repeats):
+    """Returns (mean, p95) latency of run() in milliseconds."""
+    run() # Warm up
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        run()
+        samples.append((time.perf_counter() - start) * 1000.0)
+    samples.sort()
+    return sum(samples) / len(samples), samples[int(0.95 * (len(samples) - 1))]
+
+def report_lstm(paths, repeats):
+    print(f"\n{'LSTM model':<32} {'size KB':>8} {'accuracy':>9} {'mean ms':>8} {'p95 ms':>8}")
+    windows = labels = None
+    for path in paths:
+        recognizer = GestureRecognizer(model_path=path)
+        if windows is None:
+            windows, labels = load_windows(recognizer.sequence_length)
+
+        probs = recognizer.predict_proba(windows)
+        predicted = [recognizer.labels[i] for i in np.argmax(probs, axis=1)]
+        accuracy = np.mean([p == l for p, l in zip(predicted, labels)])
+
+        single = windows[:1]
+        mean_ms, p95_ms = time_invoke(lambda: recognizer.predict_proba(single), repeats)
+        size_kb = os.path.getsize(path) / 1024
+        print(f"{path:<32} {size_kb:>8.1f} {accuracy:>9.3f} {mean_ms:>8.3f} {p95_ms:>8.3f}")
+
+def report_letters(paths, videos, repeats):
+    """
+    There are no labelled letter samples in the repo, so accuracy is reported
+    as agreement with the first (reference) model. The frames are absolute
+    HandTracker landmarks from `videos`, the format ModelLoader gets at runtime;
+    data/processed holds wrist-relative frames the letter model never sees.
+    """
+    from export_letter_model import runtime_frames
+
+    frames = runtime_frames(videos, limit=1000)
+    if len(frames) == 0:
+        print("No hands found in the letter videos; skipping the letter report.")
+        return
+    print(f"\n{'Letter model':<32} {'size KB':>8} {'agreement':>9} {'mean ms':>8} {'p95 ms':>8}")
+    reference = None
+    for path in paths:
+        model = ModelLoader(model_path=path)
+        predicted, _ = model.predict_batch(frames)
+        if reference is None:
+            reference = predicted
+        agreement = np.mean([p == r for p, r in zip(predicted, reference)])
+
+        mean_ms, p95_ms = time_invoke(lambda: model.predict(frames[0]), repeats)
+        size_kb = os.path.getsize(path) / 1024
+        print(f"{path:<32} {size_kb:>8.1f} {agreement:>9.3f} {mean_ms:>8.3f} {p95_ms:>8.3f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare accuracy, size and latency of float, dynamic-range and int8 models")
+    parser.add_argument("--lstm", nargs="*", default=None,
+                        help="LSTM models (default: lstm_model_{float,dynamic,int8}.tflite from train_lstm.py --variants)")
+    parser.add_argument("--letters", nargs="*", default=[], help="Letter models; the first is the reference for agreement")
+    parser.add_argument("--letter-videos", nargs="*", default=None,
+                        help="Videos to take letter-model landmarks from (default: data/raw/<word>/*.mp4)")
+    parser.add_argument("--repeats", type=int, default=200, help="Timed invocations per model")
+    args = parser.parse_args()
+
+    lstm = args.lstm
+    if lstm is None:
+        lstm = [p for p in (f"lstm_model_{v}.tflite" for v in ("float", "dynamic", "int8")) if os.path.exists(p)]
+
+    if lstm:
+        report_lstm(lstm, args.repeats)
+    if args.letters:
+        videos = args.letter_videos or sorted(glob.glob(os.path.join(RAW_PATH, "*", "*.mp4")))
+        report_letters(args.letters, videos, args.repeats)
+    if not lstm and not args.letters:
+        print("No models to compare. Run 'python train_lstm.py --variants' first.")
+
+if __name__ == "__main__":
+    main()
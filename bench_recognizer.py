@@ -0,0 +1,91 @@
+import time
+import argparse
+import tracemalloc
+
+import numpy as np
+
+from gesture_recognizer import GestureRecognizer
+
+
+class LegacyWindow:
+    """
+    The list-based window GestureRecognizer used before the ring buffer,
+    kept here as the baseline for comparison.
+    """
+    def __init__(self, recognizer):
+        self.recognizer = recognizer
+        self.sequence_buffer = []
+
+    def process_landmarks(self, landmarks):
+        lm_np = np.array(landmarks)
+        wrist = lm_np[:3]
+        self.sequence_buffer.append(lm_np - np.tile(wrist, 21))
+        if len(self.sequence_buffer) > self.recognizer.sequence_length:
+            self.sequence_buffer.pop(0)
+        if len(self.sequence_buffer) == self.recognizer.sequence_length:
+            input_data = np.array([self.sequence_buffer], dtype=np.float32)
+            interpreter = self.recognizer.interpreter
+            interpreter.set_tensor(self.recognizer.input_details[0]['index'], input_data)
+            interpreter.invoke()
+            output_data = interpreter.get_tensor(self.recognizer.output_details[0]['index'])
+            return self.recognizer._decode(np.squeeze(output_data))
+        return None
+
+def measure(process, frames):
+    """
+    Returns:
+        tuple: (microseconds per frame, transient bytes allocated per frame)
+    """
+    # Warm up and fill the window so only the steady state is measured
+    for lm in frames[:60]:
+        process(lm)
+
+    start = time.perf_counter()
+    for lm in frames:
+        process(lm)
+    us_per_frame = (time.perf_counter() - start) / len(frames) * 1e6
+
+    # Allocation pass runs separately since tracing slows everything down
+    tracemalloc.start()
+    peak_total = 0
+    for lm in frames[:200]:
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        process(lm)
+        peak_total += tracemalloc.get_traced_memory()[1] - baseline
+    tracemalloc.stop()
+
+    return us_per_frame, peak_total / min(len(frames), 200)
+
+def main():
+    parser = argparse.ArgumentParser(description="Microbenchmark of GestureRecognizer's per-frame path")
+    parser.add_argument("--frames", type=int, default=2000, help="Number of frames to time")
+    parser.add_argument("--model", type=str, default="lstm_model.tflite")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    arrays = [rng.random(63, dtype=np.float32) for _ in range(args.frames)]
+    lists = [a.tolist() for a in arrays]
+
+    recognizer = GestureRecognizer(model_path=args.model)
+    legacy = LegacyWindow(recognizer)
+
+    def window_only(lm):
+        recognizer.sequence_buffer.append(lm)
+
+    cases = [
+        ("harness overhead (no-op)", lambda lm: None, arrays),
+        ("legacy list window (list input)", legacy.process_landmarks, lists),
+        ("ring buffer (list input)", recognizer.process_landmarks, lists),
+        ("ring buffer (ndarray input)", recognizer.process_landmarks, arrays),
+        ("ring buffer append only (ndarray)", window_only, arrays),
+    ]
+
+    print(f"{'case':<36} {'us/frame':>10} {'alloc B/frame':>14}")
+    for name, process, frames in cases:
+        recognizer.clear()
+        us, allocated = measure(process, frames)
+        print(f"{name:<36} {us:>10.1f} {allocated:>14.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+import os
+import sys
+import json
+import glob
+import time
+import platform
+import argparse
+import subprocess
+
+import cv2
+
+from hand_tracker import HandTracker
+from gesture_recognizer import GestureRecognizer, WordDebouncer
+from metrics import Metrics
+
+DATA_PATH = os.path.join("data", "raw")
+
+def find_videos(paths):
+    """
+    Collect (video_path, label) pairs. Labels come from the parent folder name,
+    matching the data/raw/<word>/*.mp4 layout used for training.
+    """
+    if not paths:
+        paths = sorted(glob.glob(os.path.join(DATA_PATH, "*", "*.mp4")))
+
+    videos = []
+    for path in paths:
+        label = os.path.basename(os.path.dirname(os.path.abspath(path)))
+        videos.append((path, label))
+    return videos
+
+def git_revision():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5)
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+def replay_clip(path, label, tracker, recognizer, metrics, realtime=False):
+    """
+    Feed one video through HandTracker -> GestureRecognizer -> WordDebouncer,
+    the same decision path main.py uses.
+
+    In real-time mode frames are released at the clip's native FPS and
+    frames that arrive while the pipeline is busy are skipped, as a live
+    camera would overwrite them.
+
+    Returns:
+        dict: Per-clip results.
+    """
+    cap = cv2.VideoCapture(path)
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    recognizer.clear()
+    tracker.reset() # Also clears the One-Euro filter and decimator, which carry state in every mode
+    debouncer = WordDebouncer()
+
+    words = []
+    frames = 0
+    skipped = 0
+    index = 0 # Index of the next frame in the file
+    start = time.perf_counter()
+
+    while cap.isOpened():
+        if realtime:
+            now = time.perf_counter()
+            available = int((now - start) * fps)
+            if available < index:
+                time.sleep(start + index / fps - now)
+            while index < available:
+                if not cap.grab():
+                    break
+                index += 1
+                skipped += 1
+
+        with metrics.timer("frame_read"):
+            success, img = cap.read()
+        if not success:
+            break
+        video_time = index / fps
+        index += 1
+        frames += 1
+        metrics.frame()
+
+        with metrics.timer("detect"):
+            tracker.find_hands(img, draw=False, timestamp_ms=video_time * 1000.0)
+        with metrics.timer("landmarks"):
+            lm_array = tracker.get_landmark_array()
+
+        if lm_array is not None:
+            with metrics.timer("recognize"):
+                prediction = recognizer.process_landmarks(lm_array)
+            word = debouncer.update(prediction)
+            if word:
+                words.append({
+                    "word": word,
+                    "video_time": round(video_time, 4),
+                    "wall_time": round(time.perf_counter() - start, 4),
+                })
+        else:
+            recognizer.clear()
+
+    cap.release()
+    elapsed = time.perf_counter() - start
+
+    first = words[0] if words else None
+    return {
+        "path": path,
+        "label": label,
+        "frames": frames,
+        "skipped_frames": skipped,
+        "seconds": round(elapsed, 4),
+        "fps": round(frames / elapsed, 2) if elapsed > 0 else 0.0,
+        "words": words,
+        "first_word": first["word"] if first else None,
+        "time_to_first_recognition": first["video_time"] if first else None,
+        "correct": bool(first and first["word"] == label),
+    }
+
+def summarize(clips, metrics):
+    frames = sum(c["frames"] for c in clips)
+    seconds = sum(c["seconds"] for c in clips)
+    labelled = [c for c in clips if c["label"]]
+    ttfr = [c["time_to_first_recognition"] for c in clips if c["time_to_first_recognition"] is not None]
+
+    stages, counters = metrics.snapshot()
+    stage_ms = {}
+    for name, (count, total, pct) in stages.items():
+        if count:
+            stage_ms[name] = {f"p{int(q * 100)}": round(v * 1000, 3) for q, v in pct.items()}
+            stage_ms[name]["mean"] = round(total / count * 1000, 3)
+
+    return {
+        "clips": len(clips),
+        "frames": frames,
+        "seconds": round(seconds, 3),
+        "fps": round(frames / seconds, 2) if seconds > 0 else 0.0,
+        "accuracy": round(sum(c["correct"] for c in labelled) / len(labelled), 4) if labelled else None,
+        "recognized_clips": len(ttfr),
+        "mean_time_to_first_recognition": round(sum(ttfr) / len(ttfr), 4) if ttfr else None,
+        "stage_ms": stage_ms,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded videos through the recognition pipeline and report throughput/accuracy.")
+    parser.add_argument("videos", nargs="*", help="Video files (default: data/raw/<word>/*.mp4). The parent folder is the label.")
+    parser.add_argument("--mode", choices=["fast", "realtime", "both"], default="both", help="'fast' processes every frame as fast as possible, 'realtime' paces frames at the video FPS")
+    parser.add_argument("--output", type=str, default="bench_results.json", help="Where to write the JSON report")
+    parser.add_argument("--tracker-mode", choices=["image", "video"], default="image",
+                        help="MediaPipe running mode (live_stream is asynchronous and not deterministic, see bench_tracker.py)")
+    parser.add_argument("--detect-every", type=int, nargs="+", default=[1],
+                        help="Largest detector interval k; several values are run back to back to compare accuracy against CPU")
+    parser.add_argument("--smoothing", action="store_true", help="Report One-Euro filtered landmarks")
+    parser.add_argument("--max-infer-hz", type=float, default=None, help="Forwarded to GestureRecognizer")
+    parser.add_argument("--latency-budget-ms", type=float, default=None, help="Forwarded to GestureRecognizer")
+    args = parser.parse_args()
+
+    videos = find_videos(args.videos)
+    if not videos:
+        print("No videos found.")
+        sys.exit(1)
+
+    modes = ["fast", "realtime"] if args.mode == "both" else [args.mode]
+    report = {
+        "revision": git_revision(),
+        "host": {"platform": platform.platform(), "machine": platform.machine(), "cpus": os.cpu_count()},
+        "config": vars(args),
+        "results": {},
+    }
+
+    runs = [(mode, k) for mode in modes for k in args.detect_every]
+    for mode, k in runs:
+        name = mode if len(args.detect_every) == 1 else f"{mode}/k={k}"
+        metrics = Metrics(window=100000)
+        tracker = HandTracker(detection_con=0.7, max_hands=1, running_mode=args.tracker_mode,
+                              smoothing=args.smoothing, detect_every=k)
+        recognizer = GestureRecognizer(max_infer_hz=args.max_infer_hz, latency_budget_ms=args.latency_budget_ms,
+                                       metrics=metrics)
+
+        print(f"--- Mode: {name} ({len(videos)} clips) ---")
+        clips = []
+        cpu_start = time.process_time()
+        try:
+            for path, label in videos:
+                clip = replay_clip(path, label, tracker, recognizer, metrics, realtime=(mode == "realtime"))
+                clips.append(clip)
+                print(f"  {path}: {clip['frames']} frames, {clip['fps']} fps, first={clip['first_word']} (label {label})")
+        finally:
+            tracker.close()
+
+        summary = summarize(clips, metrics)
+        summary["cpu_seconds"] = round(time.process_time() - cpu_start, 3)
+        summary["detector_calls"] = tracker.detections
+        summary["predicted_frames"] = tracker.predicted_frames
+        report["results"][name] = {"summary": summary, "clips": clips}
+        print(f"  => {summary['fps']} fps, accuracy {summary['accuracy']}, "
+              f"mean time-to-first-recognition {summary['mean_time_to_first_recognition']}s")
+
+    if len(args.detect_every) > 1:
+        print(f"\n{'run':<18} {'accuracy':>9} {'detect/frame':>13} {'CPU s':>8} {'CPU saved':>10}")
+        for mode in modes:
+            base = None
+            for k in args.detect_every:
+                s = report["results"][f"{mode}/k={k}"]["summary"]
+                base = base or s["cpu_seconds"]
+                saved = 1 - s["cpu_seconds"] / base if base else 0.0
+                print(f"{mode + '/k=' + str(k):<18} {s['accuracy']!s:>9} {s['detector_calls'] / max(s['frames'], 1):>13.2f} "
+                      f"{s['cpu_seconds']:>8.2f} {100 * saved:>9.1f}%")
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Report written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+import time
+import argparse
+
+import cv2
+import numpy as np
+
+from hand_tracker import HandTracker, RUNNING_MODES
+from bench_replay import find_videos
+
+
+def percentile(samples, q):
+    return float(np.percentile(samples, q)) if samples else 0.0
+
+def bench_mode(mode, videos, max_frames=None, roi=False):
+    """
+    Run every clip through a HandTracker in the given running mode.
+
+    Returns:
+        dict: Blocking time per find_hands() call, time until the result is
+        available (the same for synchronous modes) and the fraction of frames with a hand.
+    """
+    tracker = HandTracker(detection_con=0.7, max_hands=1, running_mode=mode, roi=roi)
+    tracker.warmup()
+    call_ms, result_ms = [], []
+    frames = detected = 0
+
+    for path, _ in videos:
+        tracker.reset()
+        cap = cv2.VideoCapture(path)
+        fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        index = 0
+        while cap.isOpened():
+            success, img = cap.read()
+            if not success or (max_frames and frames >= max_frames):
+                break
+
+            start = time.perf_counter()
+            tracker.find_hands(img, draw=False, timestamp_ms=index * 1000.0 / fps)
+            called = time.perf_counter()
+            tracker.wait_for_result()
+            done = time.perf_counter()
+
+            call_ms.append((called - start) * 1000.0)
+            result_ms.append((done - start) * 1000.0)
+            detected += tracker.get_landmark_array() is not None
+            frames += 1
+            index += 1
+        cap.release()
+
+    tracker.close()
+    return {
+        "frames": frames,
+        "call_ms_mean": float(np.mean(call_ms)) if call_ms else 0.0,
+        "result_ms_mean": float(np.mean(result_ms)) if result_ms else 0.0,
+        "result_ms_p95": percentile(result_ms, 95),
+        "detection_rate": detected / frames if frames else 0.0,
+        "full_scans": tracker.full_scans,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare HandTracker per-frame cost across MediaPipe running modes")
+    parser.add_argument("videos", nargs="*", help="Video files (default: data/raw/*/*.mp4)")
+    parser.add_argument("--modes", nargs="+", choices=list(RUNNING_MODES), default=list(RUNNING_MODES))
+    parser.add_argument("--max-frames", type=int, default=None, help="Stop each mode after this many frames")
+    parser.add_argument("--roi", action="store_true", help="Also run ROI cropping (always image mode)")
+    args = parser.parse_args()
+
+    videos = find_videos(args.videos)
+    if not videos:
+        print("No videos found.")
+        return
+
+    runs = [(mode, False) for mode in args.modes]
+    if args.roi:
+        runs.append(("image", True))
+
+    print(f"{'mode':<16} {'frames':>7} {'call ms':>8} {'result ms':>10} {'p95 ms':>8} {'hand %':>7} {'scans':>6}")
+    for mode, roi in runs:
+        r = bench_mode(mode, videos, args.max_frames, roi)
+        scans = r['full_scans'] if roi else r['frames']
+        name = f"{mode}+roi" if roi else mode
+        print(f"{name:<16} {r['frames']:>7} {r['call_ms_mean']:>8.2f} {r['result_ms_mean']:>10.2f} "
+              f"{r['result_ms_p95']:>8.2f} {100 * r['detection_rate']:>6.1f}% {scans:>6}")
+
+if __name__ == "__main__":
+    main()
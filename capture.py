@@ -0,0 +1,121 @@
+import time
+import threading
+import collections
+
+import cv2
+
+# One captured frame: a per-source sequence number (1, 2, ...), the capture
+# time (time.perf_counter()) and the BGR image, which belongs to the caller.
+CapturedFrame = collections.namedtuple("CapturedFrame", ["seq", "timestamp", "image"])
+
+
+class CameraCapture:
+    """
+    cv2.VideoCapture wrapper with the same interface as MJPEGStreamer: read()
+    for the latest frame and read_new(timeout) to block until a newer one.
+
+    Live cameras are read on a background thread that always holds the newest
+    frame, so a slow consumer skips frames instead of falling behind. Video files
+    are read synchronously so that no frame is dropped.
+    """
+    def __init__(self, source, width=640, height=480, threaded=None):
+        """
+        Args:
+            source (int or str): Webcam index or video file path.
+            width, height (int): Requested resolution (only honoured by local webcams).
+            threaded (bool): Read on a background thread (default: True for webcams).
+        """
+        self.cap = cv2.VideoCapture(source)
+        # Set resolution (Only works for local webcams usually, safely ignored for files)
+        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+        self.threaded = isinstance(source, int) if threaded is None else threaded
+
+        self.image = None
+        self.seq = 0 # Frames captured
+        self.timestamp = 0.0
+        self.delivered_seq = 0 # Last frame handed out
+        self.skipped = 0
+        self.stopped = not self.cap.isOpened()
+        self.lock = threading.Lock()
+        self.new_frame = threading.Condition(self.lock)
+        self.thread = None
+        if self.threaded and not self.stopped:
+            self.thread = threading.Thread(target=self._update)
+            self.thread.daemon = True
+            self.thread.start()
+
+    def _update(self):
+        while not self.stopped:
+            success, img = self.cap.read()
+            if not success:
+                time.sleep(0.01)
+                continue
+            with self.new_frame:
+                if self.image is not None and self.delivered_seq != self.seq:
+                    self.skipped += 1
+                self.image = img
+                self.seq += 1
+                self.timestamp = time.perf_counter()
+                self.new_frame.notify_all()
+
+    def read_new(self, timeout=1.0):
+        """
+        Wait for a frame newer than the last one returned and hand it over without copying.
+
+        Returns:
+            CapturedFrame: The frame, or None on timeout or end of stream.
+        """
+        if not self.threaded:
+            success, img = self.cap.read()
+            if not success:
+                self.stopped = True
+                return None
+            self.seq += 1
+            self.delivered_seq = self.seq
+            return CapturedFrame(self.seq, time.perf_counter(), img)
+
+        with self.new_frame:
+            if not self.new_frame.wait_for(lambda: self.seq > self.delivered_seq or self.stopped, timeout):
+                return None
+            if self.seq <= self.delivered_seq:
+                return None
+            self.delivered_seq = self.seq
+            frame = CapturedFrame(self.seq, self.timestamp, self.image)
+            self.image = None # The caller owns it now; read() falls back to nothing until the next frame
+            return frame
+
+    def read(self):
+        """Returns the latest frame (a copy) and a success boolean, like cv2.VideoCapture.read()."""
+        if not self.threaded:
+            success, img = self.cap.read()
+            if success:
+                self.seq += 1
+                self.delivered_seq = self.seq
+            else:
+                self.stopped = True
+            return success, img
+        with self.lock:
+            if self.image is None:
+                return False, None
+            self.delivered_seq = self.seq
+            return True, self.image.copy()
+
+    def stats(self):
+        with self.lock:
+            return {"received": self.seq, "skipped": self.skipped}
+
+    def set(self, prop, value):
+        return self.cap.set(prop, value)
+
+    def get(self, prop):
+        return self.cap.get(prop)
+
+    def isOpened(self):
+        return not self.stopped and self.cap.isOpened()
+
+    def release(self):
+        self.stopped = True
+        if self.thread:
+            self.thread.join(timeout=1)
+        self.cap.release()
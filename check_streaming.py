@@ -0,0 +1,93 @@
+import os
+import glob
+import argparse
+
+import numpy as np
+
+from gesture_recognizer import GestureRecognizer
+
+PROCESSED_PATH = os.path.join("data", "processed")
+
+def pad_sequence(sequence, length):
+    """Zero-pad sequences shorter than one window, as train_lstm.load_data does."""
+    if len(sequence) < length:
+        padding = np.zeros((length - len(sequence), sequence.shape[1]))
+        sequence = np.concatenate([sequence, padding])
+    return sequence.astype(np.float32)
+
+def training_window(sequence, length):
+    """Pad or take the middle slice, as train_lstm.load_data does."""
+    if len(sequence) > length:
+        start = (len(sequence) - length) // 2
+        sequence = sequence[start:start + length]
+    return pad_sequence(sequence, length)
+
+def compare(name, sequence, windowed, streaming, atol):
+    """
+    Feed a whole sequence to the streaming model and compare its output on every
+    frame with the windowed model on the 30-frame window ending at that frame.
+
+    Returns:
+        tuple: (max abs difference, argmax disagreements, windows compared)
+    """
+    length = windowed.sequence_length
+    windows = np.lib.stride_tricks.sliding_window_view(sequence, length, axis=0).transpose(0, 2, 1)
+    expected = windowed.predict_proba(np.ascontiguousarray(windows))
+
+    # The data is already wrist-relative, so normalizing it again is a no-op
+    streaming.clear()
+    actual = []
+    for frame in sequence:
+        streaming.sequence_buffer.append(frame)
+        probs = streaming.step()
+        if probs is not None:
+            actual.append(probs)
+    actual = np.array(actual)
+    if actual.shape != expected.shape:
+        print(f"  {name}: {len(actual)} streaming decisions for {len(expected)} windows")
+        return float("inf"), len(expected), len(expected)
+
+    diff = np.max(np.abs(expected - actual), axis=1)
+    disagreements = int(np.sum(np.argmax(expected, axis=1) != np.argmax(actual, axis=1)))
+    if diff.max() > atol:
+        print(f"  {name}: max diff {diff.max():.5f} (first at frame {int(np.argmax(diff > atol)) + length - 1})")
+    return float(diff.max()), disagreements, len(expected)
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that the streaming LSTM matches the windowed model on every sliding window of data/processed")
+    parser.add_argument("--window-model", type=str, default="lstm_model.tflite")
+    parser.add_argument("--stream-model", type=str, default="lstm_stream.tflite")
+    parser.add_argument("--atol", type=float, default=1e-2, help="Largest allowed absolute difference in class probabilities")
+    args = parser.parse_args()
+
+    windowed = GestureRecognizer(model_path=args.window_model)
+    streaming = GestureRecognizer(model_path=args.stream_model, stream_stride=1) # A decision on every frame
+    if not streaming.streaming:
+        print(f"{args.stream_model} is not a streaming model.")
+        return 1
+
+    files = sorted(glob.glob(os.path.join(PROCESSED_PATH, "*", "*.npy")))
+    sequences = [(path, pad_sequence(np.load(path), windowed.sequence_length)) for path in files]
+    # One long run across every clip: the state must not drift once it has seen more than a window
+    if len(sequences) > 1:
+        sequences.append(("all clips concatenated", np.concatenate([seq for _, seq in sequences])))
+
+    worst = 0.0
+    disagreements = 0
+    windows = 0
+    for name, sequence in sequences:
+        diff, disagree, count = compare(name, sequence, windowed, streaming, args.atol)
+        worst = max(worst, diff)
+        disagreements += disagree
+        windows += count
+
+    print(f"Checked {windows} windows in {len(sequences)} sequences: max abs diff {worst:.6f}, "
+          f"argmax disagreements {disagreements}")
+    if worst > args.atol:
+        print(f"FAIL: exceeds tolerance {args.atol}")
+        return 1
+    print("OK")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,90 @@
+import os
+import glob
+import argparse
+
+import numpy as np
+import tensorflow as tf
+
+from train_lstm import convert
+
+RAW_PATH = os.path.join("data", "raw")
+
+def runtime_frames(videos, limit=2000):
+    """
+    Landmarks exactly as ModelLoader receives them at runtime: absolute 0-1
+    image coordinates from HandTracker, not the wrist-relative frames stored in
+    data/processed (those would calibrate int8 ranges for the wrong inputs).
+
+    Returns:
+        np.ndarray: (N, 63) float32 frames with a detected hand.
+    """
+    from hand_tracker import HandTracker
+    import cv2
+
+    tracker = HandTracker(max_hands=1)
+    frames = []
+    for path in videos:
+        cap = cv2.VideoCapture(path)
+        while True:
+            success, img = cap.read()
+            if not success:
+                break
+            tracker.find_hands(img, draw=False)
+            landmarks = tracker.get_landmark_array()
+            if landmarks is not None:
+                frames.append(landmarks.reshape(-1).copy())
+        cap.release()
+    tracker.close()
+    frames = np.array(frames, dtype=np.float32).reshape(-1, 63)
+    step = max(1, len(frames) // limit)
+    return frames[::step]
+
+def representative_frames(frames, num_features):
+    """
+    Calibration data for the letter model, projected to (x, y) when the model
+    takes 42 features, as ModelLoader does at runtime.
+    """
+    if num_features == 42:
+        frames = frames.reshape(-1, 21, 3)[:, :, :2].reshape(-1, 42)
+    frames = frames[np.random.default_rng(0).permutation(len(frames))]
+    def generator():
+        for frame in frames:
+            yield [frame[np.newaxis]]
+    return generator
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the letter (fingerspelling) classifier to TFLite")
+    parser.add_argument("source", help="Trained letter model: a .keras/.h5 file or a SavedModel directory")
+    parser.add_argument("--output", type=str, default="model.tflite")
+    parser.add_argument("--quantize", choices=["float", "dynamic", "int8"], default="dynamic",
+                        help="int8 needs calibration frames in the runtime (absolute coordinate) format")
+    parser.add_argument("--calibration-videos", nargs="*", default=None,
+                        help="Videos to extract int8 calibration landmarks from (default: data/raw/<word>/*.mp4)")
+    args = parser.parse_args()
+
+    if os.path.isdir(args.source):
+        converter = tf.lite.TFLiteConverter.from_saved_model(args.source)
+        num_features = tf.saved_model.load(args.source).signatures["serving_default"].structured_input_signature[1]
+        num_features = list(num_features.values())[0].shape[-1]
+    else:
+        model = tf.keras.models.load_model(args.source)
+        converter = tf.lite.TFLiteConverter.from_keras_model(model)
+        num_features = model.inputs[0].shape[-1]
+
+    representative_data = None
+    if args.quantize == "int8":
+        videos = args.calibration_videos or sorted(glob.glob(os.path.join(RAW_PATH, "*", "*.mp4")))
+        frames = runtime_frames(videos)
+        if len(frames) == 0:
+            print("No hands found in the calibration videos; int8 export needs runtime-format landmarks.")
+            return
+        print(f"Calibrating on {len(frames)} frames from {len(videos)} videos")
+        representative_data = representative_frames(frames, num_features)
+
+    tflite_model = convert(converter, args.quantize, representative_data)
+    with open(args.output, "wb") as f:
+        f.write(tflite_model)
+    print(f"Model saved to {args.output} ({args.quantize}, {len(tflite_model) / 1024:.1f} KB)")
+
+if __name__ == "__main__":
+    main()
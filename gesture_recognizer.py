@@ -1,29 +1,205 @@
+import math
 import numpy as np
 import time
 
-# Try importing tflite_runtime, fallback to tensorflow if not available
-try:
-    import tflite_runtime.interpreter as tflite
-    # If using Select TF Ops, we might need to load the delegate or ensure library is loaded
-    # Usually standard tflite_runtime might not support Select TF Ops.
-    # If standard tflite_runtime fails, we must use tensorflow.lite
-except ImportError:
-    try:
-        import tensorflow.lite as tflite
-    except ImportError:
-        raise ImportError("Neither tflite_runtime nor tensorflow is installed.")
+from tflite_utils import create_interpreter, is_quantized, quantize, dequantize
+
+class SequenceBuffer:
+    """
+    Sliding window of the most recent wrist-relative landmark frames.
+
+    Frames live in a preallocated float32 ring. Each frame is stored twice, in
+    slot i and i + sequence_length, so every window is one contiguous slice of
+    the ring. Appending a float32 frame and reading the window do not allocate.
+    """
+    def __init__(self, sequence_length=30, num_features=63):
+        self.sequence_length = sequence_length
+        self.ring = np.zeros((2 * sequence_length, num_features), dtype=np.float32)
+        # Views of each slot (flat, as (landmarks, 3), its wrist and its mirror) and
+        # of the window starting at each slot, created once: building a view
+        # allocates, even when its data does not
+        self.rows = list(self.ring[:sequence_length])
+        self.mirrors = list(self.ring[sequence_length:])
+        self.rows3 = [row.reshape(-1, 3) for row in self.rows]
+        self.row_wrists = [row[:3] for row in self.rows]
+        self.windows = [self.ring[i:i + sequence_length] for i in range(sequence_length)]
+        self.batches = [window[np.newaxis] for window in self.windows]
+        self.wrist = np.zeros((num_features // 3, 3), dtype=np.float32) # Wrist repeated per landmark
+        self.wrist_flat = self.wrist.reshape(-1)
+        self.head = 0 # Slot the next frame is written to (also the oldest frame when full)
+        self.count = 0
+
+    def append(self, landmarks):
+        """
+        Normalize one frame into the ring, overwriting the oldest frame when full.
+
+        Args:
+            landmarks (list or np.ndarray): 63 landmarks (21 * 3), flat or shaped (21, 3).
+                A float32 array (HandTracker.get_landmark_array) is used without conversion.
+        """
+        lm_np = np.asarray(landmarks, dtype=np.float32)
+        row = self.rows[self.head]
+
+        # Copy the frame into its slot, then normalize it in place relative to the
+        # wrist (first 3 values are x,y,z of wrist). A flat subtract avoids the
+        # temporary buffers of a broadcasting ufunc.
+        np.copyto(self.rows3[self.head] if lm_np.ndim == 2 else row, lm_np)
+        np.copyto(self.wrist, self.row_wrists[self.head])
+        np.subtract(row, self.wrist_flat, out=row)
+        np.copyto(self.mirrors[self.head], row)
+
+        self.head = (self.head + 1) % self.sequence_length
+        if self.count < self.sequence_length:
+            self.count += 1
+
+    def is_full(self):
+        return self.count == self.sequence_length
+
+    def latest(self):
+        """View of the most recently appended frame."""
+        return self.rows[self.head - 1]
+
+    def window(self, out=None):
+        """
+        Copy the buffered frames in chronological order.
+
+        Args:
+            out (np.ndarray): Optional (sequence_length, 63) destination, e.g. an interpreter tensor view.
+
+        Returns:
+            np.ndarray: (sequence_length, 63) float32 window, oldest frame first.
+        """
+        if out is None:
+            return self.windows[self.head].copy()
+        np.copyto(out, self.windows[self.head])
+        return out
+
+    def batch(self):
+        """
+        The window as a (1, sequence_length, 63) view of the ring, oldest frame
+        first, e.g. for Interpreter.set_tensor(). Valid until the next append().
+        """
+        return self.batches[self.head]
+
+    def clear(self):
+        self.head = 0
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+
+class InferenceScheduler:
+    """
+    Decides on which frames the LSTM runs so inference stays within a budget.
+
+    Consecutive windows overlap by all but one frame, so skipping some of them
+    loses little information. The stride is derived from the measured invoke()
+    time and adapts as the host gets busier or quieter.
+    """
+    def __init__(self, max_infer_hz=None, latency_budget_ms=None, max_stride=15, smoothing=0.2):
+        """
+        Args:
+            max_infer_hz (float): Upper bound on inferences per second.
+            latency_budget_ms (float): Average inference time allowed per frame.
+            max_stride (int): Never skip more than this many frames in a row.
+            smoothing (float): Weight of the newest sample in the invoke time average.
+        """
+        self.max_infer_hz = max_infer_hz
+        self.latency_budget_ms = latency_budget_ms
+        self.max_stride = max_stride
+        self.smoothing = smoothing
+        self.invoke_ms = None # Moving average of invoke() time
+        self.stride = 1
+        self.reset()
+
+    def reset(self):
+        """Run on the next full window (e.g. after the hand was lost)."""
+        self.frames_since_run = self.stride
+        self.last_run_time = 0.0
+
+    def should_run(self, now):
+        """
+        Called once per frame with a full window.
+
+        Args:
+            now (float): Current time in seconds.
+
+        Returns:
+            bool: True if inference should run on this frame.
+        """
+        self.frames_since_run += 1
+        if self.frames_since_run < self.stride:
+            return False
+        if self.max_infer_hz and now - self.last_run_time < 1.0 / self.max_infer_hz:
+            return False
+        return True
+
+    def record(self, invoke_seconds, now):
+        """
+        Record a completed inference and update the stride.
+
+        Args:
+            invoke_seconds (float): Measured invoke() duration.
+            now (float): Time the inference ran.
+        """
+        self.frames_since_run = 0
+        self.last_run_time = now
+
+        sample_ms = invoke_seconds * 1000.0
+        if self.invoke_ms is None:
+            self.invoke_ms = sample_ms
+        else:
+            self.invoke_ms += self.smoothing * (sample_ms - self.invoke_ms)
+
+        if self.latency_budget_ms:
+            stride = math.ceil(self.invoke_ms / self.latency_budget_ms)
+            self.stride = min(max(stride, 1), self.max_stride)
+
 
 class GestureRecognizer:
     """
     Handles real-time gesture recognition using an LSTM TFLite model.
+
+    Two model layouts are supported:
+    - windowed (lstm_model.tflite): input (1, 30, 63), the whole window is re-run per inference.
+    - streaming (lstm_stream.tflite, see train_lstm.build_streaming_model): inputs are one
+      frame and the packed LSTM state, so each new frame costs one LSTM step per live state.
+      The model was trained on 30-frame windows, so a state must not see more history than
+      that: staggered states are started every `stream_stride` frames and each one is read
+      and restarted after exactly 30 frames, giving the windowed model's result for the
+      newest window every `stream_stride` frames.
+    The layout is detected from the model's inputs.
     """
-    def __init__(self, model_path="lstm_model.tflite", label_path="labels.txt", threshold=0.8):
+    def __init__(self, model_path="lstm_model.tflite", label_path="labels.txt", threshold=0.8,
+                 max_infer_hz=None, latency_budget_ms=None, metrics=None,
+                 num_threads=None, use_xnnpack=True, autotune=False, stream_stride=5):
         """
         Initialize the recognizer.
+
+        Args:
+            max_infer_hz (float): Optional cap on inferences per second.
+            latency_budget_ms (float): Optional average inference time allowed per frame.
+                When either is set, inference runs only on some frames (see InferenceScheduler).
+            metrics (Metrics): Optional registry receiving invoke() timings.
+            num_threads, use_xnnpack, autotune: Interpreter settings, see tflite_utils.create_interpreter.
+            stream_stride (int): Streaming models only: frames between decisions. Costs
+                ceil(30 / stream_stride) LSTM steps per frame; 1 decides on every frame.
+
+        In streaming mode the scheduler is not used: every frame must advance the state.
         """
         self.threshold = threshold
         self.sequence_length = 30
-        self.sequence_buffer = [] # Buffer to store landmarks
+        self.sequence_buffer = SequenceBuffer(self.sequence_length) # Buffer to store landmarks
+        self.batch_size = 1 # Current batch dimension of the input tensor
+        self.last_invoke_ms = None
+        self.metrics = metrics
+        self.stream_stride = max(1, min(stream_stride, self.sequence_length))
+        self.last_probs = None # Streaming: probabilities of the last completed window
+
+        self.scheduler = None
+        if max_infer_hz or latency_budget_ms:
+            self.scheduler = InferenceScheduler(max_infer_hz=max_infer_hz, latency_budget_ms=latency_budget_ms)
         
         # Load Labels
         self.labels = []
@@ -37,42 +213,95 @@ class GestureRecognizer:
         try:
             # If using Select TF ops, we might need extra arguments for Interpreter in some versions
             # But usually it's automatic if tensorflow is installed
-            self.interpreter = tflite.Interpreter(model_path=model_path)
-            self.interpreter.allocate_tensors()
+            self.interpreter = create_interpreter(model_path, num_threads=num_threads,
+                                                  use_xnnpack=use_xnnpack, autotune=autotune)
             
             self.input_details = self.interpreter.get_input_details()
             self.output_details = self.interpreter.get_output_details()
+
+            self.streaming = len(self.input_details) == 2
+            if self.streaming:
+                self._init_streaming()
+            else:
+                self.input_detail = self.input_details[0]
+                self.output_detail = self.output_details[0]
+            self.input_index = self.input_detail['index']
+            self.output_index = self.output_detail['index']
+
+            # Callables returning views of the interpreter's own buffers (no copies)
+            self.input_tensor = self.interpreter.tensor(self.input_index)
+            self.output_tensor = self.interpreter.tensor(self.output_index)
+
+            # Full-integer models take int8 input: landmarks are quantized via a float scratch buffer
+            self.input_quantized = is_quantized(self.input_detail)
+            self.scratch = np.empty(self.input_detail['shape'][1:], dtype=np.float32)
+            self.input_buffer = np.empty(self.input_detail['shape'], dtype=self.input_detail['dtype'])
+            self.input_row = self.input_buffer[0]
+            # Per-frame outputs are copied out of the interpreter into these, and decoded in place
+            self.output_buffer = np.empty(self.output_detail['shape'], dtype=self.output_detail['dtype'])
+            self.output_row = self.output_buffer[0]
+            self.probs = np.empty(self.output_row.shape, dtype=np.float32)
+            self.best = np.zeros((), dtype=np.intp) # argmax destination
             
-            print(f"Gesture Recognizer initialized. Labels: {self.labels}")
+            mode = "streaming" if self.streaming else "windowed"
+            print(f"Gesture Recognizer initialized ({mode}). Labels: {self.labels}")
             
         except Exception as e:
             print(f"Error loading LSTM model: {e}")
             raise
 
+    def _init_streaming(self):
+        """Identify the frame/state tensors of a streaming model by their shapes."""
+        num_features = self.sequence_buffer.ring.shape[1]
+        frame_in = [d for d in self.input_details if d['shape'][-1] == num_features][0]
+        state_in = [d for d in self.input_details if d is not frame_in][0]
+        state_size = state_in['shape'][-1]
+        state_out = [d for d in self.output_details if d['shape'][-1] == state_size][0]
+        probs_out = [d for d in self.output_details if d is not state_out][0]
+
+        self.input_detail = frame_in
+        self.output_detail = probs_out
+        self.state_in_detail = state_in
+        self.state_out_detail = state_out
+        self.state_input_tensor = self.interpreter.tensor(state_in['index'])
+        self.state_output_tensor = self.interpreter.tensor(state_out['index'])
+        # Quantized state needs requantizing when input and output scales differ
+        self.state_requantize = (state_in['dtype'] != state_out['dtype']
+                                 or state_in['quantization'] != state_out['quantization'])
+        self.state_zero = state_in['quantization'][1] if is_quantized(state_in) else 0
+        num_states = -(-self.sequence_length // self.stream_stride)
+        self.states = np.empty((num_states, state_size), dtype=state_in['dtype'])
+        self.state_ages = np.empty(num_states, dtype=np.int64) # Frames each state has seen; < 0 = not started
+        self.scheduler = None
+        self._reset_state()
+
+    def _reset_state(self):
+        """Zero every streaming LSTM state (the zero point for quantized state) and restagger them."""
+        self.states.fill(self.state_zero)
+        self.state_ages[:] = -self.stream_stride * np.arange(len(self.state_ages))
+        self.last_probs = None
+
     def process_landmarks(self, landmarks):
         """
         Add landmarks to buffer and run inference if buffer is full.
         
         Args:
-            landmarks (list): 63 landmarks (21 * 3)
+            landmarks (list or np.ndarray): 63 landmarks (21 * 3), e.g. HandTracker.get_landmark_array()
             
         Returns:
-            str: Predicted action or None if uncertainty/buffer filling
+            str: Predicted action or None if uncertainty/buffer filling/skipped by the scheduler
         """
-        # Normalize landmarks relative to wrist (first 3 values are x,y,z of wrist)
-        # We need numpy for this
-        lm_np = np.array(landmarks)
-        wrist = lm_np[:3]
-        relative_lm = lm_np - np.tile(wrist, 21) # Subtract wrist from all
-        
-        self.sequence_buffer.append(relative_lm)
-        
-        # Maintain buffer size
-        if len(self.sequence_buffer) > self.sequence_length:
-            self.sequence_buffer.pop(0)
+        self.sequence_buffer.append(landmarks)
+
+        if self.streaming:
+            probs = self.step()
+            # Only decide when a state has seen exactly one full window, as in training
+            return self._decode(probs) if probs is not None else None
             
         # Predict if we have enough frames
-        if len(self.sequence_buffer) == self.sequence_length:
+        if self.sequence_buffer.is_full():
+            if self.scheduler and not self.scheduler.should_run(time.perf_counter()):
+                return None
             return self._predict()
             
         return None
@@ -81,26 +310,24 @@ class GestureRecognizer:
         """
         Run inference on the current buffer.
         """
-        # Prepare input
-        input_data = np.array([self.sequence_buffer], dtype=np.float32)
-        
-        # Check input shape
-        # expected (1, 30, 63)
-        
         try:
-            self.interpreter.set_tensor(self.input_details[0]['index'], input_data)
-            self.interpreter.invoke()
-            
-            output_data = self.interpreter.get_tensor(self.output_details[0]['index'])
-            prediction = np.squeeze(output_data)
-            
-            max_index = np.argmax(prediction)
-            confidence = prediction[max_index]
-            
-            if confidence > self.threshold:
-                if self.labels:
-                    return self.labels[max_index]
-                return str(max_index)
+            if self.batch_size != 1:
+                self._resize(1)
+
+            # Hand the interpreter the window as a contiguous view of the ring; it is
+            # copied once, into the (1, 30, 63) input tensor
+            if self.input_quantized:
+                quantize(self.sequence_buffer.window(out=self.scratch), self.input_detail, out=self.input_row)
+                self.interpreter.set_tensor(self.input_index, self.input_buffer)
+            else:
+                self.interpreter.set_tensor(self.input_index, self.sequence_buffer.batch())
+
+            self._run_interpreter()
+            # The output view must be released before the next invoke()
+            output_view = self.output_tensor()
+            np.copyto(self.output_buffer, output_view)
+            del output_view
+            return self._decode(dequantize(self.output_row, self.output_detail, out=self.probs))
             
         except Exception as e:
             print(f"Inference error: {e}")
@@ -108,5 +335,175 @@ class GestureRecognizer:
             
         return None
 
+    def step(self):
+        """
+        Advance every live streaming state by the newest buffered frame.
+
+        Returns:
+            np.ndarray: Class probabilities of the 30-frame window that ended on this
+                frame, or None if no state completed a window.
+        """
+        input_view = self.input_tensor()
+        if self.input_quantized:
+            self.scratch[...] = self.sequence_buffer.latest()
+            quantize(self.scratch, self.input_detail, out=input_view[0])
+        else:
+            input_view[0] = self.sequence_buffer.latest()
+        del input_view
+
+        probs = None
+        for i in range(len(self.states)):
+            if self.state_ages[i] < 0: # Staggered start
+                self.state_ages[i] += 1
+                continue
+
+            state_in = self.state_input_tensor()
+            state_in[0] = self.states[i]
+            del state_in
+            self._run_interpreter()
+
+            # Keep the new state for this slot's next step
+            if self.state_requantize:
+                state = dequantize(self.state_output_tensor()[0], self.state_out_detail).astype(np.float32)
+                if is_quantized(self.state_in_detail):
+                    quantize(state, self.state_in_detail, out=self.states[i])
+                else:
+                    self.states[i] = state
+            else:
+                self.states[i] = self.state_output_tensor()[0]
+
+            self.state_ages[i] += 1
+            if self.state_ages[i] == self.sequence_length:
+                # This state has seen exactly one window: read it, then restart it
+                probs = dequantize(self.interpreter.get_tensor(self.output_index)[0], self.output_detail)
+                self.states[i] = self.state_zero
+                self.state_ages[i] = 0
+        if probs is not None:
+            self.last_probs = probs
+        return probs
+
+    def predict_batch(self, windows):
+        """
+        Run one interpreter call over several windows, e.g. from different streams.
+        Only available for windowed models.
+
+        Args:
+            windows (np.ndarray): (N, 30, 63) wrist-relative landmark windows.
+
+        Returns:
+            list: Predicted action or None for each window.
+        """
+        return [self._decode(row) for row in self.predict_proba(windows)]
+
+    def predict_proba(self, windows):
+        """
+        Class probabilities for a batch of windows (windowed models only).
+
+        Args:
+            windows (np.ndarray): (N, 30, 63) wrist-relative landmark windows.
+
+        Returns:
+            np.ndarray: (N, num_classes) float probabilities.
+        """
+        input_data = np.asarray(windows, dtype=np.float32)
+        if self.input_quantized:
+            input_data = quantize(input_data, self.input_detail)
+        return dequantize(self._invoke(input_data), self.output_detail)
+
+    def _resize(self, batch_size):
+        """Resize the input tensor to a new batch dimension."""
+        shape = (batch_size, self.sequence_length, self.input_detail['shape'][-1])
+        self.interpreter.resize_tensor_input(self.input_index, shape)
+        self.interpreter.allocate_tensors()
+        self.batch_size = batch_size
+
+    def _invoke(self, input_data):
+        """Set the input batch, resizing the interpreter if its size changed, and invoke."""
+        if self.streaming:
+            raise ValueError("Batched prediction needs a windowed model")
+        if len(input_data) != self.batch_size:
+            self._resize(len(input_data))
+
+        self.interpreter.set_tensor(self.input_index, input_data)
+        self._run_interpreter()
+        return self.interpreter.get_tensor(self.output_index)
+
+    def _run_interpreter(self):
+        """Invoke the interpreter and record its latency."""
+        start = time.perf_counter()
+        self.interpreter.invoke()
+        elapsed = time.perf_counter() - start
+        self.last_invoke_ms = elapsed * 1000.0
+        if self.scheduler:
+            self.scheduler.record(elapsed, start)
+        if self.metrics:
+            self.metrics.observe("invoke", elapsed)
+
+    def _decode(self, prediction):
+        """Map one row of class probabilities to a label if it is confident enough."""
+        prediction.argmax(out=self.best) # The method form with out= creates no temporaries
+        max_index = self.best.item()
+        confidence = prediction.item(max_index)
+
+        if confidence > self.threshold:
+            if self.labels:
+                return self.labels[max_index]
+            return str(max_index)
+        return None
+
+    def warmup(self):
+        """
+        Run one untimed invoke() on zeroed inputs so the first real frame does not
+        pay for lazy kernel and delegate preparation.
+        """
+        for detail in self.interpreter.get_input_details():
+            self.interpreter.set_tensor(detail['index'], np.zeros(detail['shape'], dtype=detail['dtype']))
+        self.interpreter.invoke()
+        if self.streaming:
+            self._reset_state()
+
     def clear(self):
-        self.sequence_buffer = []
+        self.sequence_buffer.clear()
+        if self.scheduler:
+            self.scheduler.reset()
+        if self.streaming:
+            self._reset_state()
+
+
+class WordDebouncer:
+    """
+    Decides when a recognized word should be spoken.
+
+    A word is emitted when it differs from the last spoken word, or when the
+    same word keeps being recognized for longer than the cooldown.
+    """
+    def __init__(self, cooldown_frames=30):
+        """
+        Args:
+            cooldown_frames (int): Frames the same word must persist before it is repeated.
+        """
+        self.cooldown_frames = cooldown_frames
+        self.last_word = ""
+        self.cooldown_counter = 0
+
+    def update(self, prediction):
+        """
+        Feed the recognizer output for one frame.
+
+        Args:
+            prediction (str): Predicted word or None.
+
+        Returns:
+            str: The word to speak now, else None.
+        """
+        word = None
+        if prediction:
+            if prediction != self.last_word or self.cooldown_counter > self.cooldown_frames:
+                word = prediction
+                self.last_word = prediction
+                self.cooldown_counter = 0
+
+        if self.last_word == prediction:
+            self.cooldown_counter += 1
+
+        return word
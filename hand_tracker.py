@@ -1,76 +1,314 @@
+import time
+import threading
+
 import cv2
 import numpy as np
 import mediapipe as mp
 from mediapipe.tasks import python
 from mediapipe.tasks.python import vision
 
+from landmark_filter import OneEuroFilter, DetectionDecimator
+
+RUNNING_MODES = {
+    "image": vision.RunningMode.IMAGE,
+    "video": vision.RunningMode.VIDEO,
+    "live_stream": vision.RunningMode.LIVE_STREAM,
+}
+
 class HandTracker:
     """
     Wrapper for MediaPipe Hand Landmarker (Tasks API) to detect a single hand and extract landmarks.
+
+    Running modes:
+        image: every frame runs palm detection from scratch (detect()).
+        video: frames are a sequence (detect_for_video()); once a hand is found it is
+            tracked from the previous landmarks and palm detection only reruns when it is lost.
+        live_stream: like video but asynchronous (detect_async()); find_hands() returns
+            immediately and `results` holds the latest finished frame, usually one behind.
+
+    ROI mode crops each frame around the previous frame's hand and downscales the
+    crop to a small working resolution, so the conversion and the landmarker see a
+    fraction of the pixels. Landmarks are mapped back to full-frame normalized
+    coordinates. A full-frame scan only runs when the hand is lost. The crop is
+    the tracking here, so ROI detection always runs in image mode: video mode's
+    temporal tracking would see the coordinate frame move with every crop.
+
+    With detect_every > 1 the landmarker is skipped on some frames and landmarks
+    are extrapolated by a One-Euro filter's velocity estimate; the interval adapts
+    to hand speed. smoothing=True also reports filtered landmarks on detected frames.
     """
-    def __init__(self, mode=False, max_hands=1, detection_con=0.5, track_con=0.5, model_path="hand_landmarker.task"):
+    def __init__(self, mode=False, max_hands=1, detection_con=0.5, track_con=0.5, model_path="hand_landmarker.task",
+                 running_mode="image", roi=False, roi_size=224, roi_margin=0.5, scan_width=640,
+                 smoothing=False, detect_every=1):
         """
         Initialize the MediaPipe Hand Landmarker.
+
+        Args:
+            running_mode (str): 'image', 'video' or 'live_stream'.
+            roi (bool): Track the first hand with a cropped region of interest.
+            roi_size (int): Longest side, in pixels, the crop is downscaled to.
+            roi_margin (float): Padding added on each side of the hand box, as a fraction of its size.
+            scan_width (int): Longest side for full-frame scans in ROI mode (larger frames are downscaled).
+            smoothing (bool): Report One-Euro filtered landmarks instead of raw detections.
+            detect_every (int): Largest detector interval k; 1 runs the detector on every frame.
         """
+        if running_mode not in RUNNING_MODES:
+            raise ValueError(f"Unknown running mode '{running_mode}', expected one of {list(RUNNING_MODES)}")
+        if roi and running_mode == "live_stream":
+            raise ValueError("ROI mode needs the crop for each result and does not support live_stream")
+        if roi and running_mode == "video":
+            print("ROI mode tracks the hand itself; running the landmarker in image mode.")
+            running_mode = "image"
+        if (smoothing or detect_every > 1) and running_mode == "live_stream":
+            raise ValueError("Smoothing and detector decimation need synchronous results and do not support live_stream")
+        self.running_mode = running_mode
+        self.roi = roi
+        self.roi_size = roi_size
+        self.roi_margin = roi_margin
+        self.scan_width = scan_width
+        self.roi_box = None # (x0, y0, x1, y1) in full-frame pixels, None = scan the full frame
+        self.roi_hits = 0
+        self.full_scans = 0
+
+        self.smoothing = smoothing
+        self.filter = OneEuroFilter() if smoothing or detect_every > 1 else None
+        self.decimator = DetectionDecimator(max_interval=detect_every)
+        self.landmark_override = None # Filtered/predicted landmarks reported instead of `results`
+        self.raw_array = np.zeros((21, 3), dtype=np.float32)
+        self.detections = 0
+        self.predicted_frames = 0
+        self.last_timestamp_ms = -1
+        self.submitted_timestamp_ms = -1 # Last frame sent with detect_async()
+        self.result_timestamp_ms = -1 # Frame the current live-stream result belongs to
+        self.result_ready = threading.Condition()
+
         base_options = python.BaseOptions(model_asset_path=model_path)
-        options = vision.HandLandmarkerOptions(
+        self.options = vision.HandLandmarkerOptions(
             base_options=base_options,
+            running_mode=RUNNING_MODES[running_mode],
             num_hands=max_hands,
             min_hand_detection_confidence=detection_con,
-            min_hand_presence_confidence=track_con
+            min_hand_presence_confidence=track_con,
+            min_tracking_confidence=track_con,
+            result_callback=self._on_result if running_mode == "live_stream" else None
         )
-        self.detector = vision.HandLandmarker.create_from_options(options)
+        self.detector = vision.HandLandmarker.create_from_options(self.options)
         self.results = None
         
-        # Define connections for manual drawing (standard MediaPipe hand connections)
-        self.connections = [
-            (0, 1), (1, 2), (2, 3), (3, 4),           # Thumb
-            (0, 5), (5, 6), (6, 7), (7, 8),           # Index
-            (5, 9), (9, 10), (10, 11), (11, 12),      # Middle
-            (9, 13), (13, 14), (14, 15), (15, 16),    # Ring
-            (13, 17), (17, 18), (18, 19), (19, 20),   # Pinky
-            (0, 17)                                   # Wrist to Pinky
-        ]
-
-    def find_hands(self, img, draw=True):
+        # Standard MediaPipe hand connections for manual drawing, as connected
+        # chains so the whole skeleton is drawn with one cv2.polylines call
+        self.skeleton = [np.array(chain) for chain in (
+            (0, 1, 2, 3, 4),        # Thumb
+            (0, 5, 6, 7, 8),        # Index
+            (5, 9, 10, 11, 12),     # Middle
+            (9, 13, 14, 15, 16),    # Ring
+            (13, 17, 18, 19, 20),   # Pinky
+            (0, 17))]               # Wrist to Pinky
+        self.landmark_array = np.zeros((21, 3), dtype=np.float32) # Reused by get_landmark_array()
+        self.draw_array = np.zeros((21, 3), dtype=np.float32)
+
+    def find_hands(self, img, draw=True, timestamp_ms=None):
         """
         Process the image to find hands.
+
+        Args:
+            timestamp_ms (int): Frame time for video/live_stream modes, e.g. the position in
+                a video file. Defaults to the monotonic clock. Must increase between calls.
         """
-        img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-        mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=img_rgb)
-        
-        self.results = self.detector.detect(mp_image)
+        t = timestamp_ms / 1000.0 if timestamp_ms is not None else time.monotonic()
 
-        if self.results.hand_landmarks:
-            for hand_lms in self.results.hand_landmarks:
-                if draw:
-                    self._draw_landmarks_manual(img, hand_lms)
+        if self.filter is not None and self.filter.initialized() and not self.decimator.should_detect():
+            # Skip the landmarker; extrapolate from the motion model
+            self.landmark_override = self.filter.predict(t)
+            self.predicted_frames += 1
+        else:
+            self.detections += 1
+            if self.roi:
+                self._find_hands_roi(img, timestamp_ms)
+            else:
+                img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+                mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=img_rgb)
+                
+                self._detect(mp_image, timestamp_ms)
+            self._update_motion(t)
+
+        if draw:
+            if self.landmark_override is not None:
+                self._draw_landmarks_manual(img, self.landmark_override)
+            elif self.results and self.results.hand_landmarks:
+                for hand_lms in self.results.hand_landmarks:
+                    self._draw_landmarks_manual(img, self._to_array(hand_lms, self.draw_array))
         return img
 
+    def _update_motion(self, t):
+        """Feed a fresh detection to the filter and pick the next detector interval."""
+        if self.filter is None:
+            return
+        if self.results and self.results.hand_landmarks:
+            filtered = self.filter(self._to_array(self.results.hand_landmarks[0], self.raw_array), t)
+            self.decimator.update(self.filter.speed())
+            self.landmark_override = filtered if self.smoothing else None
+        else:
+            self.filter.reset()
+            self.decimator.reset()
+            self.landmark_override = None
+
+    def _find_hands_roi(self, img, timestamp_ms=None):
+        h, w = img.shape[:2]
+
+        if self.roi_box is not None:
+            x0, y0, x1, y1 = self.roi_box
+            self._detect(self._to_mp_image(img[y0:y1, x0:x1], self.roi_size), timestamp_ms)
+            if self.results.hand_landmarks:
+                self.roi_hits += 1
+                self._map_to_frame(x0, y0, x1 - x0, y1 - y0, w, h)
+            else:
+                self.roi_box = None # Lost it: rescan this frame in full
+
+        if self.roi_box is None:
+            self.full_scans += 1
+            self._detect(self._to_mp_image(img, self.scan_width), timestamp_ms)
+
+        self._update_roi(w, h)
+
+    def _to_mp_image(self, bgr, max_side):
+        """Downscale (never upscale) so the longest side is at most max_side, then convert to RGB."""
+        h, w = bgr.shape[:2]
+        if max_side and max(h, w) > max_side:
+            scale = max_side / max(h, w)
+            bgr = cv2.resize(bgr, (max(1, round(w * scale)), max(1, round(h * scale))), interpolation=cv2.INTER_AREA)
+        return mp.Image(image_format=mp.ImageFormat.SRGB, data=cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB))
+
+    def _map_to_frame(self, x0, y0, crop_w, crop_h, w, h):
+        """Convert landmarks from crop-normalized to full-frame-normalized coordinates."""
+        sx, sy = crop_w / w, crop_h / h
+        ox, oy = x0 / w, y0 / h
+        for hand_lms in self.results.hand_landmarks:
+            for lm in hand_lms:
+                lm.x = ox + lm.x * sx
+                lm.y = oy + lm.y * sy
+                lm.z = lm.z * sx # z uses the same scale as x
+
+    def _update_roi(self, w, h):
+        """Square box around the first hand plus margin, or None to scan the full frame next time."""
+        if not (self.results and self.results.hand_landmarks):
+            self.roi_box = None
+            return
+
+        hand = self.results.hand_landmarks[0]
+        xs = [lm.x * w for lm in hand]
+        ys = [lm.y * h for lm in hand]
+        cx, cy = (min(xs) + max(xs)) / 2, (min(ys) + max(ys)) / 2
+        side = max(max(xs) - min(xs), max(ys) - min(ys)) * (1 + 2 * self.roi_margin)
+
+        if side >= 0.9 * min(w, h):
+            self.roi_box = None # Hand fills the frame; cropping gains nothing
+            return
+        x0, y0 = int(max(0, cx - side / 2)), int(max(0, cy - side / 2))
+        x1, y1 = int(min(w, cx + side / 2)), int(min(h, cy + side / 2))
+        self.roi_box = (x0, y0, x1, y1) if x1 - x0 > 1 and y1 - y0 > 1 else None
+
+    def _next_timestamp(self, timestamp_ms=None):
+        """MediaPipe rejects timestamps that do not strictly increase."""
+        if timestamp_ms is None:
+            timestamp_ms = int(time.monotonic() * 1000)
+        timestamp_ms = max(int(timestamp_ms), self.last_timestamp_ms + 1)
+        self.last_timestamp_ms = timestamp_ms
+        return timestamp_ms
+
+    def _detect(self, mp_image, timestamp_ms=None):
+        if self.running_mode == "image":
+            self.results = self.detector.detect(mp_image)
+        elif self.running_mode == "video":
+            self.results = self.detector.detect_for_video(mp_image, self._next_timestamp(timestamp_ms))
+        else:
+            self.submitted_timestamp_ms = self._next_timestamp(timestamp_ms)
+            self.detector.detect_async(mp_image, self.submitted_timestamp_ms)
+
+    def _on_result(self, result, output_image, timestamp_ms):
+        """Live-stream callback, runs on MediaPipe's thread."""
+        with self.result_ready:
+            self.results = result
+            self.result_timestamp_ms = timestamp_ms
+            self.result_ready.notify_all()
+
+    def wait_for_result(self, timeout=1.0):
+        """
+        In live-stream mode, block until the last submitted frame has a result.
+        Useful for offline processing where every frame's landmarks are needed.
+
+        Returns:
+            bool: False on timeout.
+        """
+        if self.running_mode != "live_stream":
+            return True
+        with self.result_ready:
+            return self.result_ready.wait_for(lambda: self.result_timestamp_ms >= self.submitted_timestamp_ms, timeout)
+
+    def reset(self):
+        """Drop tracking state, e.g. before starting a new video file."""
+        self.detector.close()
+        self.detector = vision.HandLandmarker.create_from_options(self.options)
+        self.results = None
+        self.roi_box = None
+        self.landmark_override = None
+        if self.filter is not None:
+            self.filter.reset()
+        self.decimator.reset()
+        self.last_timestamp_ms = self.submitted_timestamp_ms = self.result_timestamp_ms = -1
+
     def _draw_landmarks_manual(self, img, landmarks):
         """
         Manually draw landmarks and connections since mp.solutions.drawing_utils is unavailable.
+
+        Args:
+            landmarks (np.ndarray): (21, 3) normalized landmarks.
         """
         h, w, c = img.shape
         # Convert normalized coordinates to pixel coordinates
-        points = []
-        for lm in landmarks:
-            cx, cy = int(lm.x * w), int(lm.y * h)
-            points.append((cx, cy))
+        points = (landmarks[:, :2] * (w, h)).astype(np.int32)
 
         # Draw connections
-        for p1_idx, p2_idx in self.connections:
-            if p1_idx < len(points) and p2_idx < len(points):
-                cv2.line(img, points[p1_idx], points[p2_idx], (255, 255, 255), 3)
+        cv2.polylines(img, [points[chain] for chain in self.skeleton], False, (255, 255, 255), 3)
+
+        # Draw points: a closed one-point polyline is a round dot, the same as a filled
+        # radius-5 circle, and all 21 go in a single call
+        cv2.polylines(img, list(points.reshape(-1, 1, 1, 2)), True, (0, 0, 255), 10)
 
-        # Draw points
-        for cx, cy in points:
-             cv2.circle(img, (cx, cy), 5, (0, 0, 255), cv2.FILLED)
+    @staticmethod
+    def _to_array(hand_landmarks, out):
+        """Copy MediaPipe landmark objects into a (21, 3) float32 array."""
+        for i, lm in enumerate(hand_landmarks):
+            out[i] = (lm.x, lm.y, lm.z)
+        return out
+
+    def get_landmark_array(self, out=None):
+        """
+        Normalized (x, y, z) coordinates of the first detected hand as a (21, 3) float32 array.
+
+        Args:
+            out (np.ndarray): Destination array. By default an internal buffer is
+                reused, so its contents change on the next call; copy it (or pass
+                `out`) if it must outlive the frame, e.g. when handed to another thread.
+
+        Returns:
+            np.ndarray: The landmarks, or None if no hand was found.
+        """
+        if out is None:
+            out = self.landmark_array
+        if self.landmark_override is not None:
+            out[:] = self.landmark_override
+            return out
+        if self.results and self.results.hand_landmarks:
+            return self._to_array(self.results.hand_landmarks[0], out)
+        return None
 
     def get_landmark_data(self):
         """
         Extract normalized (x, y, z) coordinates for the first detected hand.
         """
+        if self.landmark_override is not None:
+            return self.landmark_override.reshape(-1).tolist()
         if self.results and self.results.hand_landmarks:
             # Only process the first hand
             my_hand = self.results.hand_landmarks[0]
@@ -81,6 +319,16 @@ class HandTracker:
             return lm_list
         return None
 
+    def warmup(self, width=640, height=480):
+        """
+        Run the detector once on a blank frame so graph initialization happens
+        before the first camera frame.
+        """
+        blank = np.zeros((height, width, 3), dtype=np.uint8)
+        self._detect(mp.Image(image_format=mp.ImageFormat.SRGB, data=blank))
+        self.wait_for_result()
+        self.results = None
+
     def close(self):
         """Release MediaPipe resources."""
         self.detector.close()
@@ -0,0 +1,132 @@
+import math
+
+import numpy as np
+
+
+class OneEuroFilter:
+    """
+    One-Euro filter applied element-wise to a (21, 3) landmark array.
+
+    Slow movement is smoothed heavily (removes detector jitter) while fast
+    movement passes through with little lag. The filtered derivative doubles as
+    a constant-velocity motion model used to predict landmarks on frames where
+    the detector is skipped.
+    """
+    def __init__(self, min_cutoff=1.0, beta=10.0, d_cutoff=1.0, shape=(21, 3)):
+        """
+        Args:
+            min_cutoff (float): Cutoff frequency (Hz) when the hand is still; lower = smoother.
+            beta (float): How fast the cutoff rises with speed; higher = less lag when moving.
+            d_cutoff (float): Cutoff frequency (Hz) for the derivative estimate.
+        """
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.x_hat = np.zeros(shape, dtype=np.float32)
+        self.dx_hat = np.zeros(shape, dtype=np.float32)
+        self.scratch = np.zeros(shape, dtype=np.float32)
+        self.alpha = np.zeros(shape, dtype=np.float32)
+        self.prediction = np.zeros(shape, dtype=np.float32)
+        self.t_prev = None
+
+    @staticmethod
+    def _alpha(cutoff, dt):
+        tau = 1.0 / (2 * math.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+
+    def reset(self):
+        self.t_prev = None
+
+    def initialized(self):
+        return self.t_prev is not None
+
+    def __call__(self, x, t):
+        """
+        Filter one measurement.
+
+        Args:
+            x (np.ndarray): Raw (21, 3) landmarks.
+            t (float): Measurement time in seconds.
+
+        Returns:
+            np.ndarray: Filtered landmarks (an internal buffer, valid until the next call).
+        """
+        if self.t_prev is None:
+            self.x_hat[:] = x
+            self.dx_hat.fill(0)
+            self.t_prev = t
+            return self.x_hat
+
+        dt = max(t - self.t_prev, 1e-3)
+        self.t_prev = t
+
+        # Derivative of the raw signal, low-passed
+        np.subtract(x, self.x_hat, out=self.scratch)
+        self.scratch *= 1.0 / dt
+        a_d = self._alpha(self.d_cutoff, dt)
+        self.dx_hat *= 1.0 - a_d
+        self.dx_hat += a_d * self.scratch
+
+        # Speed-dependent cutoff per element: alpha = 1 / (1 + 1 / (2*pi*cutoff*dt))
+        np.abs(self.dx_hat, out=self.alpha)
+        self.alpha *= self.beta
+        self.alpha += self.min_cutoff
+        self.alpha *= 2 * math.pi * dt
+        np.divide(self.alpha, self.alpha + 1.0, out=self.alpha)
+
+        # x_hat += alpha * (x - x_hat)
+        np.subtract(x, self.x_hat, out=self.scratch)
+        self.scratch *= self.alpha
+        self.x_hat += self.scratch
+        return self.x_hat
+
+    def predict(self, t):
+        """
+        Extrapolate the last filtered landmarks to time t at constant velocity.
+
+        Returns:
+            np.ndarray: Predicted landmarks (an internal buffer, valid until the next call).
+        """
+        np.multiply(self.dx_hat, t - self.t_prev, out=self.prediction)
+        self.prediction += self.x_hat
+        return self.prediction
+
+    def speed(self):
+        """Mean 2D keypoint speed in normalized image units per second."""
+        v = self.dx_hat[:, :2]
+        return float(np.mean(np.sqrt(v[:, 0] ** 2 + v[:, 1] ** 2)))
+
+
+class DetectionDecimator:
+    """
+    Chooses how many frames to wait before the next detector run based on hand speed:
+    every frame when the hand moves fast, up to `max_interval` frames when it is still.
+    """
+    def __init__(self, max_interval=4, still_speed=0.05, fast_speed=0.6):
+        """
+        Args:
+            max_interval (int): Largest k (detector runs at least every k-th frame).
+            still_speed (float): Speed (normalized units/s) at or below which k = max_interval.
+            fast_speed (float): Speed at or above which k = 1.
+        """
+        self.max_interval = max_interval
+        self.still_speed = still_speed
+        self.fast_speed = fast_speed
+        self.interval = 1
+        self.frames_since_detect = 0
+
+    def update(self, speed):
+        """Called after each detection with the current hand speed."""
+        frac = (speed - self.still_speed) / (self.fast_speed - self.still_speed)
+        frac = min(max(frac, 0.0), 1.0)
+        self.interval = max(1, round(self.max_interval - frac * (self.max_interval - 1)))
+        self.frames_since_detect = 0
+
+    def should_detect(self):
+        """Called once per frame."""
+        self.frames_since_detect += 1
+        return self.frames_since_detect >= self.interval
+
+    def reset(self):
+        self.interval = 1
+        self.frames_since_detect = 0
@@ -0,0 +1,229 @@
+import time
+import random
+import struct
+import socket
+import threading
+import collections
+
+import numpy as np
+
+# Wire format (little-endian), one message per frame:
+#   magic "S2SL" | version u8 | flags u8 | stream_id u16 | session u32 | seq u32 | timestamp f64 | landmarks
+# landmarks are 63 float16 (FLAG_HALF) or float32 values, absent when FLAG_NO_HAND is set.
+# session is chosen at random by each sender, so a restarted sender (seq back at 0) is told apart.
+# Over TCP each message is prefixed with its u16 length; over UDP one datagram is one message.
+MAGIC = b"S2SL"
+VERSION = 2
+HEADER = struct.Struct("<4sBBHIId")
+LENGTH = struct.Struct("<H")
+FLAG_HALF = 0x01
+FLAG_NO_HAND = 0x02
+NUM_VALUES = 63
+DEFAULT_PORT = 9300
+
+LandmarkMessage = collections.namedtuple("LandmarkMessage", ["stream_id", "session", "seq", "timestamp", "landmarks"])
+
+
+def encode(stream_id, seq, timestamp, landmarks, half=True, session=0):
+    """
+    Pack one frame.
+
+    Args:
+        stream_id (int): Camera id, 0-65535.
+        seq (int): Frame counter, used to drop reordered UDP datagrams.
+        timestamp (float): Capture time in seconds.
+        landmarks (np.ndarray): 63 values (or (21, 3)), or None when no hand was found.
+        half (bool): Send float16 (126 bytes) instead of float32 (252 bytes).
+        session (int): Sender's random session id; seq restarts at 0 with a new one.
+
+    Returns:
+        bytes: The message.
+    """
+    flags = FLAG_HALF if half else 0
+    if landmarks is None:
+        return HEADER.pack(MAGIC, VERSION, flags | FLAG_NO_HAND, stream_id, session, seq & 0xFFFFFFFF, timestamp)
+    payload = np.asarray(landmarks, dtype=np.float16 if half else np.float32).reshape(-1)
+    if payload.size != NUM_VALUES:
+        raise ValueError(f"Expected {NUM_VALUES} landmark values, got {payload.size}")
+    return HEADER.pack(MAGIC, VERSION, flags, stream_id, session, seq & 0xFFFFFFFF, timestamp) + payload.tobytes()
+
+def decode(data):
+    """
+    Unpack one message.
+
+    Returns:
+        LandmarkMessage: landmarks is a float32 (21, 3) array or None.
+    """
+    magic, version, flags, stream_id, session, seq, timestamp = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("Not a landmark message")
+    if flags & FLAG_NO_HAND:
+        return LandmarkMessage(stream_id, session, seq, timestamp, None)
+
+    dtype = np.float16 if flags & FLAG_HALF else np.float32
+    expected = HEADER.size + NUM_VALUES * np.dtype(dtype).itemsize
+    if len(data) != expected:
+        raise ValueError(f"Bad message length {len(data)}, expected {expected}")
+    values = np.frombuffer(data, dtype=dtype, count=NUM_VALUES, offset=HEADER.size)
+    return LandmarkMessage(stream_id, session, seq, timestamp, values.astype(np.float32).reshape(21, 3))
+
+
+class LandmarkSender:
+    """
+    Sends landmark frames from an edge device to an aggregator.
+    """
+    def __init__(self, host, port=DEFAULT_PORT, stream_id=0, transport="udp", half=True):
+        """
+        Args:
+            transport (str): 'udp' (no retransmits; late frames are useless anyway) or
+                'tcp' (reliable, reconnects on failure).
+        """
+        self.address = (host, port)
+        self.stream_id = stream_id
+        self.transport = transport
+        self.half = half
+        self.session = random.getrandbits(32)
+        self.seq = 0
+        self.bytes_sent = 0
+        self.dropped = 0
+        self.retry_at = 0.0
+        self.sock = None
+        self._connect()
+
+    def _connect(self):
+        """Open the socket; self.sock is only set once the connection succeeded."""
+        if self.transport == "udp":
+            self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        else:
+            sock = socket.create_connection(self.address, timeout=5)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self.sock = sock
+
+    def send(self, landmarks, timestamp=None):
+        """
+        Send one frame; landmarks=None reports that the hand was lost.
+        Over TCP, frames are dropped while the aggregator is unreachable and the
+        connection is retried at most once a second.
+        """
+        message = encode(self.stream_id, self.seq, time.time() if timestamp is None else timestamp,
+                         landmarks, self.half, self.session)
+        self.seq += 1
+        if self.sock is None:
+            if time.time() < self.retry_at:
+                self.dropped += 1
+                return
+            try:
+                self._connect()
+            except OSError as e:
+                print(f"Landmark reconnect failed: {e}")
+                self.retry_at = time.time() + 1.0
+                self.dropped += 1
+                return
+        try:
+            if self.transport == "udp":
+                self.sock.sendto(message, self.address)
+            else:
+                self.sock.sendall(LENGTH.pack(len(message)) + message)
+            self.bytes_sent += len(message)
+        except OSError as e:
+            print(f"Landmark send error: {e}")
+            self.dropped += 1
+            if self.transport == "tcp":
+                self.close() # Reconnected lazily by the next send()
+
+    def close(self):
+        if self.sock:
+            self.sock.close()
+            self.sock = None
+
+
+class LandmarkReceiver:
+    """
+    Listens for landmark frames and calls `on_message(message, address)` for each
+    one, from a background thread. Datagrams older than the last one seen for
+    their stream and sender session are dropped; a new session (a restarted
+    sender) starts afresh. TCP is ordered, so each connection keeps its own
+    sequence table and a reconnecting sender is never mistaken for a stale one.
+    """
+    def __init__(self, on_message, host="0.0.0.0", port=DEFAULT_PORT, transport="udp"):
+        self.on_message = on_message
+        self.transport = transport
+        self.last_seq = {}
+        self.messages = 0
+        self.bytes_received = 0
+        self.stopped = False
+
+        if transport == "udp":
+            self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        else:
+            self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind((host, port))
+        self.sock.settimeout(0.5)
+        if transport == "tcp":
+            self.sock.listen()
+        self.port = self.sock.getsockname()[1]
+
+        self.thread = threading.Thread(target=self._serve_udp if transport == "udp" else self._serve_tcp)
+        self.thread.daemon = True
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def _dispatch(self, data, address, last_seq):
+        try:
+            message = decode(data)
+        except (ValueError, struct.error) as e:
+            print(f"Dropped malformed landmark message from {address}: {e}")
+            return
+        self.messages += 1
+        self.bytes_received += len(data)
+
+        key = (address[0], message.stream_id)
+        last = last_seq.get(key)
+        if last is not None and last[0] == message.session and message.seq <= last[1]:
+            return
+        last_seq[key] = (message.session, message.seq)
+        self.on_message(message, address)
+
+    def _serve_udp(self):
+        while not self.stopped:
+            try:
+                data, address = self.sock.recvfrom(2048)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            self._dispatch(data, address, self.last_seq)
+
+    def _serve_tcp(self):
+        while not self.stopped:
+            try:
+                conn, address = self.sock.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            t = threading.Thread(target=self._serve_connection, args=(conn, address))
+            t.daemon = True
+            t.start()
+
+    def _serve_connection(self, conn, address):
+        last_seq = {} # Fresh for every connection
+        with conn:
+            reader = conn.makefile("rb")
+            while not self.stopped:
+                header = reader.read(LENGTH.size)
+                if len(header) < LENGTH.size:
+                    break
+                (length,) = LENGTH.unpack(header)
+                data = reader.read(length)
+                if len(data) < length:
+                    break
+                self._dispatch(data, address, last_seq)
+
+    def stop(self):
+        self.stopped = True
+        self.sock.close()
+        self.thread.join(timeout=1)
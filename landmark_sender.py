@@ -0,0 +1,83 @@
+import time
+import argparse
+
+import numpy as np
+
+from landmark_protocol import LandmarkSender, DEFAULT_PORT
+
+
+def send_from_camera(args, sender):
+    """Run HandTracker on a camera/stream/video and send its landmarks."""
+    from hand_tracker import HandTracker
+    from main import open_source
+
+    cap = open_source(args.source)
+    tracker = HandTracker(detection_con=0.7, max_hands=1, running_mode="video")
+    frames = 0
+    start = time.time()
+    try:
+        while cap.isOpened():
+            frame = cap.read_new(timeout=1.0)
+            if frame is None:
+                continue
+            timestamp = time.time()
+            tracker.find_hands(frame.image, draw=False, timestamp_ms=frame.timestamp * 1000.0)
+            sender.send(tracker.get_landmark_array(), timestamp)
+            frames += 1
+            if frames % 300 == 0:
+                report(sender, frames, start)
+    finally:
+        cap.release()
+        tracker.close()
+    report(sender, frames, start)
+
+def send_recorded(args, sender):
+    """
+    Send landmark sequences recorded by process_dataset.py (.npy files) at a fixed
+    frame rate. Needs no camera or MediaPipe, so the protocol and the receiver
+    can be tested over localhost.
+    """
+    frames = 0
+    start = time.time()
+    for _ in range(args.loops):
+        for path in args.replay:
+            for lm in np.load(path):
+                sender.send(lm if np.any(lm) else None) # process_dataset stores all-zero rows for "no hand"
+                frames += 1
+                time.sleep(1.0 / args.fps)
+            sender.send(None) # Separate clips like a hand leaving the frame
+    report(sender, frames, start)
+
+def report(sender, frames, start):
+    elapsed = max(time.time() - start, 1e-6)
+    print(f"[{sender.stream_id}] {frames} frames, {sender.bytes_sent / 1024:.1f} KB sent "
+          f"({sender.bytes_sent / elapsed / 1024:.2f} KB/s, {sender.bytes_sent / max(frames, 1):.0f} B/frame, "
+          f"{sender.dropped} dropped)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Edge mode: detect hands locally and send only landmarks to a multi_stream.py --listen server")
+    parser.add_argument("--server", type=str, default="127.0.0.1", help="Aggregator host")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--transport", choices=["udp", "tcp"], default="udp")
+    parser.add_argument("--stream-id", type=int, default=0, help="Camera id, unique per sender host")
+    parser.add_argument("--float32", action="store_true", help="Send float32 instead of float16 landmarks")
+    parser.add_argument("--source", type=str, default="0", help="Webcam index, video file or MJPEG URL")
+    parser.add_argument("--replay", nargs="+", default=None, help="Send recorded .npy landmark sequences instead of running the tracker")
+    parser.add_argument("--fps", type=float, default=30.0, help="Frame rate for --replay")
+    parser.add_argument("--loops", type=int, default=1, help="How many times to repeat --replay")
+    args = parser.parse_args()
+
+    sender = LandmarkSender(args.server, args.port, stream_id=args.stream_id,
+                            transport=args.transport, half=not args.float32)
+    try:
+        if args.replay:
+            send_recorded(args, sender)
+        else:
+            send_from_camera(args, sender)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sender.close()
+
+if __name__ == "__main__":
+    main()
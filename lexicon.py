@@ -0,0 +1,101 @@
+import bisect
+
+import numpy as np
+
+# Used when no lexicon file is given
+DEFAULT_VOCABULARY = ["HELLO", "HI", "YES", "NO", "HELP"]
+
+
+class Lexicon:
+    """
+    Word list stored as an implicit prefix trie: the words are kept sorted, so
+    every prefix covers one contiguous range of them. Extending a prefix by a
+    letter narrows the current range with two binary searches inside it, and
+    completions are the best-ranked words in the range. A 100k-word list takes
+    a few MB, far less than a node-per-letter trie in Python.
+    """
+    def __init__(self, words, ranks=None):
+        """
+        Args:
+            words (list): Words, in any order. Case is ignored; non A-Z words are skipped.
+            ranks (list): Frequency rank per word (0 = most common). Defaults to list order.
+        """
+        if ranks is None:
+            ranks = range(len(words))
+        best = {}
+        for word, rank in zip(words, ranks):
+            word = word.strip().upper()
+            if word.isalpha() and word.isascii() and rank < best.get(word, float("inf")):
+                best[word] = rank
+        self.words = sorted(best)
+        self.ranks = np.array([best[w] for w in self.words], dtype=np.int32)
+
+    @classmethod
+    def from_file(cls, path, limit=None):
+        """
+        Load a word list: one word per line, most frequent first, or "word count"
+        lines (space or tab separated) in any order. Lines whose second column is
+        not a number, e.g. a two-word phrase, are skipped with a warning.
+
+        Args:
+            limit (int): Keep only the `limit` most frequent words.
+        """
+        words, counts = [], []
+        skipped = 0
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                parts = line.split()
+                if not parts:
+                    continue
+                count = None
+                if len(parts) > 1:
+                    try:
+                        count = float(parts[1])
+                    except ValueError:
+                        skipped += 1
+                        continue
+                words.append(parts[0])
+                counts.append(count)
+        if skipped:
+            print(f"Warning: skipped {skipped} malformed line(s) in {path}")
+
+        if counts and all(c is not None for c in counts):
+            order = np.argsort(-np.array(counts), kind="stable")
+            words = [words[i] for i in order]
+        if limit:
+            words = words[:limit]
+        return cls(words)
+
+    def __len__(self):
+        return len(self.words)
+
+    def __contains__(self, word):
+        i = bisect.bisect_left(self.words, word)
+        return i < len(self.words) and self.words[i] == word
+
+    def narrow(self, prefix, lo=0, hi=None):
+        """
+        Find the range of words starting with `prefix`, searching only inside
+        [lo, hi) - the range of a shorter prefix of it.
+
+        Returns:
+            tuple: (lo, hi); empty when lo == hi.
+        """
+        if hi is None:
+            hi = len(self.words)
+        lo = bisect.bisect_left(self.words, prefix, lo, hi)
+        hi = bisect.bisect_left(self.words, prefix + "\x7f", lo, hi) # "\x7f" sorts after every letter
+        return lo, hi
+
+    def completions(self, lo, hi, k=3):
+        """
+        Returns:
+            list: Up to k words from [lo, hi), most frequent first.
+        """
+        ranks = self.ranks[lo:hi]
+        if len(ranks) > k:
+            best = np.argpartition(ranks, k)[:k]
+        else:
+            best = np.arange(len(ranks))
+        best = best[np.argsort(ranks[best])]
+        return [self.words[lo + i] for i in best]
@@ -1,124 +1,352 @@
-import cv2
 import time
+import queue
 import sys
 import os
 import argparse
+import importlib
+from concurrent.futures import ThreadPoolExecutor
 
-from hand_tracker import HandTracker
-# from model_loader import ModelLoader
-# from word_builder import WordBuilder
-from speech_engine import SpeechEngine
-from gesture_recognizer import GestureRecognizer
+# cv2, mediapipe and the TFLite runtime are imported lazily (see init_components)
+# so they load in parallel and argument errors are reported instantly.
+from metrics import Metrics, MetricsServer, SummaryPrinter
+
+def open_source(source, decode_width=None, capture_cls=None, streamer_cls=None):
+    """
+    Open a webcam index, video file or MJPEG URL. Every source supports
+    read_new(timeout), which returns each frame once with its sequence number
+    and capture time.
+
+    Args:
+        decode_width (int): For MJPEG streams, decode JPEGs at a reduced scale that
+            keeps frames at least this wide.
+        capture_cls (type): CameraCapture, when the caller has already imported it.
+        streamer_cls (type): MJPEGStreamer, when the caller has already imported it.
+    """
+    is_url = source.startswith("http://") or source.startswith("https://")
+
+    if is_url:
+        if streamer_cls is None:
+            from mjpeg_streamer import MJPEGStreamer as streamer_cls
+        return streamer_cls(source, max_width=decode_width).start()
+
+    if source.isdigit():
+        source = int(source)
+    print(f"Opening video source: {source}")
+    if capture_cls is None:
+        from capture import CameraCapture as capture_cls
+    # Resolution 640x480 (Only works for local webcams usually, safely ignored for files)
+    return capture_cls(source, width=640, height=480)
+
+def draw_overlay(img, current_word):
+    """Draw the status bar and exit on 'q'/'Esc'. Returns False when the user quits."""
+    import cv2
+    # Draw distinct box for stats
+    cv2.rectangle(img, (0, 0), (640, 80), (0, 0, 0), cv2.FILLED)
+
+    # Display Prediction
+    cv2.putText(img, current_word, (10, 50),
+                cv2.FONT_HERSHEY_PLAIN, 2, (0, 255, 0), 3)
+
+    cv2.imshow("Sign2Speech", img)
+
+    key = cv2.waitKey(1)
+    return not (key == ord('q') or key == 27) # q or ESC
+
+def run_loop(args, cap, tracker, recognizer, speech, metrics):
+    """Single-threaded loop: every frame runs every stage in turn."""
+    while cap.isOpened():
+        # Blocks until a frame we have not processed yet arrives, so duplicates
+        # never reach the tracker or the sequence buffer
+        with metrics.timer("frame_read"):
+            frame = cap.read_new(timeout=1.0)
+        if frame is None:
+            if not cap.isOpened():
+                break
+            metrics.inc("empty_frames")
+            print("No new camera frame...")
+            continue
+        img, frame_time = frame.image, frame.timestamp
+        metrics.frame()
+
+        # 1. Detect Hand
+        with metrics.timer("detect"):
+            tracker.find_hands(img, draw=True, timestamp_ms=frame_time * 1000.0)
+        with metrics.timer("landmarks"):
+            lm_array = tracker.get_landmark_array()
+
+        current_word = "Listening..."
+
+        # 2. Recognize letters and/or words from the same landmarks
+        try:
+            current_word, words = recognizer.process(lm_array)
+            for word in words:
+                print(f"Matched Word: {word}")
+                with metrics.timer("speech_enqueue"):
+                    speech.say(word, timestamp=frame_time)
+        except Exception as e:
+            print(f"Prediction error: {e}")
+
+        if not args.headless:
+            # UI Display
+            if not draw_overlay(img, current_word):
+                break
+
+def run_pipeline(args, cap, tracker, recognizer, speech, metrics):
+    """
+    Pipelined loop: capture, detection, recognition and speech each run on
+    their own worker, connected by bounded drop-oldest queues.
+    """
+    from pipeline import DropOldestQueue, Pipeline, PipelineItem
+    import numpy as np
+
+    pipeline = Pipeline(queue_size=args.queue_size, on_drop=lambda item: metrics.inc("dropped_frames"))
+
+    def capture():
+        with metrics.timer("frame_read"):
+            frame = cap.read_new(timeout=0.1)
+        if frame is None:
+            metrics.inc("empty_frames")
+            return None
+        return PipelineItem(frame.seq, frame.timestamp, frame.image)
+
+    def detect(item):
+        with metrics.timer("detect"):
+            tracker.find_hands(item.image, draw=not args.headless, timestamp_ms=item.timestamp * 1000.0)
+        with metrics.timer("landmarks"):
+            # Own array per item: the tracker's buffer is reused on the next frame
+            item.landmarks = tracker.get_landmark_array(out=np.empty((21, 3), dtype=np.float32))
+        return item
+
+    def recognize(item):
+        metrics.frame()
+        item.status, words = recognizer.process(item.landmarks)
+        for word in words:
+            print(f"Matched Word: {word}")
+            speech_queue.put((word, item.timestamp))
+        return item
+
+    def speak(entry):
+        word, frame_time = entry
+        with metrics.timer("speech_enqueue"):
+            speech.say(word, timestamp=frame_time)
+
+    speech_queue = DropOldestQueue(args.queue_size, on_drop=lambda entry: metrics.inc("dropped_words"))
+    pipeline.add_stage("capture", capture, source=True)
+    pipeline.add_stage("detect", detect)
+    display_queue = pipeline.add_stage("recognize", recognize, sink=args.headless)
+    pipeline.add_stage("speech", speak, inbox=speech_queue, sink=True)
+    pipeline.start()
+
+    last_report = time.time()
+    try:
+        while cap.isOpened():
+            if time.time() - last_report >= args.report_interval:
+                print(f"[pipeline] {pipeline.report()}")
+                last_report = time.time()
+
+            if args.headless:
+                time.sleep(0.1)
+                continue
+
+            try:
+                item = display_queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+
+            # UI Display
+            if not draw_overlay(item.image, item.status):
+                break
+    finally:
+        pipeline.stop()
+
+def import_component(module_name, class_name, timings):
+    """
+    Import one component class, recording how long the import took. Imports run
+    on the main thread, one after another: importing TensorFlow from several
+    threads at once can fail with a _DeadlockError on its module locks.
+
+    Returns:
+        type: The component class.
+    """
+    start = time.perf_counter()
+    cls = getattr(importlib.import_module(module_name), class_name)
+    timings[class_name] = (time.perf_counter() - start, 0.0, 0.0)
+    return cls
+
+def load_component(cls, kwargs, timings):
+    """
+    Construct and warm up one (already imported) component, recording how long each step took.
+
+    Returns:
+        object: The constructed component.
+    """
+    start = time.perf_counter()
+    component = cls(**kwargs)
+    created = time.perf_counter()
+    if hasattr(component, "warmup"):
+        component.warmup()
+    imported = timings.get(cls.__name__, (0.0,))[0]
+    timings[cls.__name__] = (imported, created - start, time.perf_counter() - created)
+    return component
+
+def init_components(args, metrics):
+    """
+    Initialize the tracker, recognizer, speech engine and video source.
+    Modules are imported serially on this thread; construction and warm-up,
+    where most of the remaining time goes, run concurrently.
+
+    Returns:
+        tuple: (tracker, recognizer, speech, cap), where recognizer is a
+            MultiModeRecognizer running the models selected by --mode.
+    """
+    timings = {}
+    start = time.perf_counter()
+
+    # Import what open_source() needs here too, so the camera worker doesn't import cv2
+    from capture import CameraCapture
+    from mjpeg_streamer import MJPEGStreamer
+
+    def open_camera():
+        cam_start = time.perf_counter()
+        cap = open_source(args.source, args.decode_width, capture_cls=CameraCapture, streamer_cls=MJPEGStreamer)
+        timings["Camera"] = (0.0, time.perf_counter() - cam_start, 0.0)
+        return cap
+    tracker_cls = import_component("hand_tracker", "HandTracker", timings)
+    recognizer_cls = import_component("gesture_recognizer", "GestureRecognizer", timings) if args.mode != "letters" else None
+    letters_cls = import_component("model_loader", "ModelLoader", timings) if args.mode != "words" else None
+    speech_cls = import_component("speech_engine", "SpeechEngine", timings)
+
+    if args.autotune:
+        # Sweep one model at a time: concurrent sweeps would time threads competing
+        # for the same cores. Construction below then reads the cached results.
+        from tflite_utils import tuned_config
+        tune_start = time.perf_counter()
+        for model_path in (args.lstm_model if recognizer_cls else None, args.letter_model if letters_cls else None):
+            if model_path:
+                tuned_config(model_path)
+        timings["Autotune"] = (0.0, time.perf_counter() - tune_start, 0.0)
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        tracker = pool.submit(load_component, tracker_cls,
+                              dict(detection_con=0.7, max_hands=1, running_mode=args.tracker_mode,
+                                   roi=args.roi, roi_size=args.roi_size, scan_width=args.scan_width,
+                                   smoothing=args.smoothing, detect_every=args.detect_every), timings)
+        interpreter_options = dict(num_threads=args.num_threads, use_xnnpack=not args.no_xnnpack,
+                                   autotune=args.autotune)
+        recognizer = letters = None
+        if args.mode != "letters":
+            recognizer = pool.submit(load_component, recognizer_cls,
+                                     dict(model_path=args.lstm_model, max_infer_hz=args.max_infer_hz,
+                                          latency_budget_ms=args.latency_budget_ms, metrics=metrics,
+                                          **interpreter_options), timings)
+        if args.mode != "words":
+            letters = pool.submit(load_component, letters_cls,
+                                  dict(model_path=args.letter_model, **interpreter_options), timings)
+        from audio_cache import load_vocabulary
+        vocabulary = None if args.no_audio_cache else load_vocabulary()
+        speech = pool.submit(load_component, speech_cls,
+                             {"metrics": metrics, "vocabulary": vocabulary}, timings)
+        cap = pool.submit(open_camera)
+        from recognition import Fingerspeller, MultiModeRecognizer
+        speller = None
+        if letters:
+            from lexicon import Lexicon
+            lexicon = Lexicon.from_file(args.lexicon, limit=args.lexicon_limit) if args.lexicon else None
+            speller = Fingerspeller(letters.result(), args.stability, lexicon=lexicon)
+        models = MultiModeRecognizer(recognizer.result() if recognizer else None, speller, metrics=metrics)
+        components = (tracker.result(), models, speech.result(), cap.result())
+
+    total = time.perf_counter() - start
+    print(f"{'Startup (s)':<20} {'import':>7} {'init':>7} {'warmup':>7}")
+    for name, (imported, created, warmed) in timings.items():
+        print(f"  {name:<18} {imported:>7.2f} {created:>7.2f} {warmed:>7.2f}")
+    sequential = sum(sum(t) for t in timings.values())
+    print(f"Ready in {total:.2f}s (components took {sequential:.2f}s combined)")
+    return components
 
 def main():
     parser = argparse.ArgumentParser(description="Sign2Speech - Edge AI Fingerspelling Translator")
     parser.add_argument("--source", type=str, default="0", help="Video source: webcam index (0) or URL (http://...)")
+    parser.add_argument("--decode-width", type=int, default=None,
+                        help="MJPEG sources: decode at 1/2, 1/4 or 1/8 scale while keeping at least this width (e.g. 320)")
     parser.add_argument("--headless", action="store_true", help="Run without UI display (for Raspberry Pi)")
+    parser.add_argument("--pipeline", action="store_true", help="Run capture, detection, recognition and speech as separate pipelined stages")
+    parser.add_argument("--queue-size", type=int, default=2, help="Capacity of each inter-stage queue in pipeline mode (oldest items are dropped)")
+    parser.add_argument("--report-interval", type=float, default=5.0, help="Seconds between per-stage throughput reports in pipeline mode")
+    parser.add_argument("--tracker-mode", choices=["image", "video", "live_stream"], default="image",
+                        help="MediaPipe running mode: per-frame detection, synchronous tracking, or asynchronous tracking (results lag about one frame)")
+    parser.add_argument("--roi", action="store_true", help="Crop around the tracked hand and detect at a reduced working resolution")
+    parser.add_argument("--roi-size", type=int, default=224, help="Working resolution (longest side) of the ROI crop")
+    parser.add_argument("--scan-width", type=int, default=640, help="Working resolution of full-frame scans in ROI mode")
+    parser.add_argument("--smoothing", action="store_true", help="Smooth landmarks with a One-Euro filter")
+    parser.add_argument("--detect-every", type=int, default=1,
+                        help="Run the landmarker at most every k-th frame when the hand is still, predicting landmarks in between (1 = every frame)")
+    parser.add_argument("--mode", choices=["letters", "words", "both"], default="words",
+                        help="Fingerspelled letters (model.tflite + WordBuilder), whole words (LSTM), or both from the same landmarks")
+    parser.add_argument("--letter-model", type=str, default="model.tflite", help="Static letter model for --mode letters/both")
+    parser.add_argument("--stability", type=float, default=1.0, help="Seconds a letter must be held to be accepted")
+    parser.add_argument("--lexicon", type=str, default=None,
+                        help="Word list for fingerspelling: one word per line (most frequent first) or 'word count' lines")
+    parser.add_argument("--lexicon-limit", type=int, default=None, help="Keep only this many of the most frequent lexicon words")
+    parser.add_argument("--lstm-model", type=str, default="lstm_model.tflite", help="Whole-word model: windowed (lstm_model.tflite) or streaming (lstm_stream.tflite)")
+    parser.add_argument("--max-infer-hz", type=float, default=None, help="Cap LSTM inferences per second (skips overlapping windows)")
+    parser.add_argument("--latency-budget-ms", type=float, default=None, help="Average LSTM time allowed per frame; the inference stride adapts to measured invoke() time")
+    parser.add_argument("--num-threads", type=int, default=None, help="TFLite interpreter threads (default: runtime default)")
+    parser.add_argument("--no-xnnpack", action="store_true", help="Disable the default XNNPACK CPU delegate")
+    parser.add_argument("--autotune", action="store_true", help="Pick the fastest thread/delegate configuration for this host (cached on disk)")
+    parser.add_argument("--no-audio-cache", action="store_true", help="Synthesize every word live instead of playing pre-rendered clips")
+    parser.add_argument("--metrics-port", type=int, default=0, help="Serve Prometheus metrics at http://<host>:<port>/metrics (0 = disabled)")
+    parser.add_argument("--metrics-host", type=str, default="127.0.0.1", help="Interface for the metrics endpoint")
+    parser.add_argument("--metrics-interval", type=float, default=0, help="Print a latency summary every N seconds (0 = disabled)")
     args = parser.parse_args()
 
-    print("Initializing Sign2Speech (Whole Word Mode)...")
+    print(f"Initializing Sign2Speech ({args.mode} mode)...")
+    metrics = Metrics()
     
     # Initialize components
     try:
-        # Check if model exists
-        if not os.path.exists("lstm_model.tflite"):
-            print("ERROR: 'lstm_model.tflite' not found in current directory.")
+        # Check if models exist
+        if args.mode != "letters" and not os.path.exists(args.lstm_model):
+            print(f"ERROR: '{args.lstm_model}' not found in current directory.")
             print("Please run train_lstm.py first.")
             return
+        if args.mode != "words" and not os.path.exists(args.letter_model):
+            print(f"ERROR: '{args.letter_model}' not found in current directory.")
+            print("Please place the letter model here or export it with export_letter_model.py.")
+            return
 
-        tracker = HandTracker(detection_con=0.7, max_hands=1)
-        # model = ModelLoader(model_path="model.tflite")
-        # wb = WordBuilder(stability_duration=1.0)
-        recognizer = GestureRecognizer()
-        speech = SpeechEngine()
+        tracker, recognizer, speech, cap = init_components(args, metrics)
         
     except Exception as e:
         print(f"Initialization failed: {e}")
         return
 
-    # Initialize Camera
-    source = args.source
-    is_url = source.startswith("http://") or source.startswith("https://")
-    
-    if is_url:
-        from mjpeg_streamer import MJPEGStreamer
-        cap = MJPEGStreamer(source).start()
-    else:
-        if source.isdigit():
-            source = int(source)
-        print(f"Opening video source: {source}")
-        cap = cv2.VideoCapture(source)
-        # Set resolution to 640x480 (Only works for local webcams usually, safely ignored for streams)
-        cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
+    metrics_server = MetricsServer(metrics, args.metrics_port, args.metrics_host).start() if args.metrics_port else None
+    summary_printer = SummaryPrinter(metrics, args.metrics_interval).start() if args.metrics_interval else None
 
     print("Starting Main Loop. Press 'q' or 'Esc' to exit.")
-    
-    last_word = ""
-    cooldown_counter = 0
 
     try:
-        while cap.isOpened():
-            success, img = cap.read()
-            if not success:
-                print("Ignoring empty camera frame...")
-                time.sleep(0.1) # Avoid log spam & high CPU polling
-                continue
-
-            # 1. Detect Hand
-            tracker.find_hands(img, draw=True)
-            lm_list = tracker.get_landmark_data()
-
-            current_word = "Listening..."
-            
-            if lm_list:
-                # 2. Recognize Gesture
-                try:
-                    prediction = recognizer.process_landmarks(lm_list)
-                    
-                    if prediction:
-                        current_word = f"Recognized: {prediction}"
-                        
-                        # Simple debounce/cooldown
-                        if prediction != last_word or cooldown_counter > 30:
-                            print(f"Matched Word: {prediction}")
-                            speech.say(prediction)
-                            last_word = prediction
-                            cooldown_counter = 0
-                        
-                    if last_word == prediction:
-                        cooldown_counter += 1
-                        
-                except Exception as e:
-                    print(f"Prediction error: {e}")
-            else:
-                recognizer.clear()
-                current_word = "No Hand"
-
-            if not args.headless:
-                # UI Display
-                # Draw distinct box for stats
-                cv2.rectangle(img, (0, 0), (640, 80), (0, 0, 0), cv2.FILLED)
-                
-                # Display Prediction
-                cv2.putText(img, current_word, (10, 50), 
-                            cv2.FONT_HERSHEY_PLAIN, 2, (0, 255, 0), 3)
-
-                cv2.imshow("Sign2Speech - Whole Word (LSTM)", img)
-
-                key = cv2.waitKey(1)
-                if key == ord('q') or key == 27: # q or ESC
-                    break
-            else:
-                # In headless mode, we still need a way to exit or just run forever
-                # We can check for a specific signal or just let it run
-                time.sleep(0.01) # Small sleep to prevent CPU hogging if cap.read() is too fast
+        if args.pipeline:
+            run_pipeline(args, cap, tracker, recognizer, speech, metrics)
+        else:
+            run_loop(args, cap, tracker, recognizer, speech, metrics)
 
     finally:
         # Cleanup
+        if metrics_server:
+            metrics_server.stop()
+        if summary_printer:
+            summary_printer.stop()
         cap.release()
-        cv2.destroyAllWindows()
+        if hasattr(cap, "stats"):
+            print(f"MJPEG frames: {cap.stats()}")
+        if not args.headless:
+            import cv2
+            cv2.destroyAllWindows()
         tracker.close()
+        recognizer.close()
+        print(f"Speech: {speech.stats()}")
         speech.cleanup()
         print("Application closed.")
 
@@ -0,0 +1,197 @@
+import collections
+import http.server
+import threading
+import time
+from contextlib import contextmanager
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class RollingHistogram:
+    """
+    Keeps the most recent samples of a timing so percentiles track current behaviour.
+    """
+    def __init__(self, window=1000):
+        """
+        Args:
+            window (int): Number of recent samples used for percentiles.
+        """
+        self.samples = collections.deque(maxlen=window)
+        self.count = 0 # Lifetime totals, as Prometheus summaries expect
+        self.total = 0.0
+
+    def observe(self, value):
+        self.samples.append(value)
+        self.count += 1
+        self.total += value
+
+    def percentiles(self, quantiles=QUANTILES):
+        """
+        Compute percentiles over the rolling window.
+
+        Returns:
+            dict: Quantile -> value, empty if nothing was recorded.
+        """
+        values = sorted(self.samples)
+        if not values:
+            return {}
+        last = len(values) - 1
+        return {q: values[min(last, int(round(q * last)))] for q in quantiles}
+
+
+class Metrics:
+    """
+    Registry for per-stage latencies (seconds), counters and frame rate.
+    Safe to update from several threads.
+    """
+    def __init__(self, window=1000, prefix="sign2speech"):
+        self.window = window
+        self.prefix = prefix
+        self.histograms = collections.OrderedDict()
+        self.counters = collections.OrderedDict()
+        self.lock = threading.Lock()
+        self.start_time = time.time()
+        self.frame_times = collections.deque(maxlen=120)
+
+    def observe(self, name, seconds):
+        """Record one latency sample for a stage."""
+        with self.lock:
+            hist = self.histograms.get(name)
+            if hist is None:
+                hist = self.histograms[name] = RollingHistogram(self.window)
+            hist.observe(seconds)
+
+    @contextmanager
+    def timer(self, name):
+        """Context manager timing the enclosed block as stage `name`."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def inc(self, name, amount=1):
+        """Increment a counter."""
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def frame(self):
+        """Mark one processed frame, used for the FPS gauge."""
+        self.frame_times.append(time.perf_counter())
+        self.inc("frames")
+
+    def fps(self):
+        times = list(self.frame_times)
+        if len(times) < 2:
+            return 0.0
+        return (len(times) - 1) / max(times[-1] - times[0], 1e-6)
+
+    def snapshot(self):
+        """
+        Returns:
+            tuple: ({stage: (count, total, {quantile: value})}, {counter: value})
+        """
+        with self.lock:
+            stages = {name: (h.count, h.total, h.percentiles()) for name, h in self.histograms.items()}
+            counters = dict(self.counters)
+        return stages, counters
+
+    def render_prometheus(self):
+        """Render all metrics in the Prometheus text exposition format."""
+        stages, counters = self.snapshot()
+        p = self.prefix
+        lines = [
+            f"# HELP {p}_stage_seconds Per-stage latency over a rolling window.",
+            f"# TYPE {p}_stage_seconds summary",
+        ]
+        for name, (count, total, pct) in stages.items():
+            for q, value in pct.items():
+                lines.append(f'{p}_stage_seconds{{stage="{name}",quantile="{q}"}} {value:.6f}')
+            lines.append(f'{p}_stage_seconds_sum{{stage="{name}"}} {total:.6f}')
+            lines.append(f'{p}_stage_seconds_count{{stage="{name}"}} {count}')
+
+        for name, value in counters.items():
+            lines.append(f"# TYPE {p}_{name}_total counter")
+            lines.append(f"{p}_{name}_total {value}")
+
+        lines.append(f"# TYPE {p}_fps gauge")
+        lines.append(f"{p}_fps {self.fps():.2f}")
+        lines.append(f"# TYPE {p}_uptime_seconds gauge")
+        lines.append(f"{p}_uptime_seconds {time.time() - self.start_time:.1f}")
+        return "\n".join(lines) + "\n"
+
+    def summary(self):
+        """Build a compact human-readable summary (milliseconds)."""
+        stages, counters = self.snapshot()
+        parts = [f"fps {self.fps():.1f}"]
+        for name, (count, total, pct) in stages.items():
+            if pct:
+                p50, p95, p99 = (pct[q] * 1000 for q in QUANTILES)
+                parts.append(f"{name} {p50:.1f}/{p95:.1f}/{p99:.1f}ms")
+        for name, value in counters.items():
+            if name != "frames":
+                parts.append(f"{name} {value}")
+        return " | ".join(parts)
+
+
+class _MetricsHandler(http.server.BaseHTTPRequestHandler):
+    metrics = None
+
+    def do_GET(self):
+        if self.path != '/metrics':
+            self.send_error(404)
+            return
+        body = self.metrics.render_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header('Content-type', 'text/plain; version=0.0.4')
+        self.send_header('Content-length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass # Scrapes would otherwise flood stdout
+
+
+class MetricsServer:
+    """
+    Serves /metrics over HTTP from a background thread.
+    """
+    def __init__(self, metrics, port=9100, host="127.0.0.1"):
+        handler = type("MetricsHandler", (_MetricsHandler,), {"metrics": metrics})
+        self.httpd = http.server.ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever)
+        self.thread.daemon = True
+
+    def start(self):
+        host, port = self.httpd.server_address[:2]
+        print(f"Metrics available at http://{host}:{port}/metrics")
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class SummaryPrinter:
+    """
+    Prints Metrics.summary() periodically from a background thread.
+    """
+    def __init__(self, metrics, interval=10.0):
+        self.metrics = metrics
+        self.interval = interval
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._run)
+        self.thread.daemon = True
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def _run(self):
+        while not self.stopped.wait(self.interval):
+            print(f"[metrics] {self.metrics.summary()}")
+
+    def stop(self):
+        self.stopped.set()
@@ -4,18 +4,195 @@ import numpy as np
 import threading
 import time
 
+from capture import CapturedFrame
+
+SOI = b'\xff\xd8' # JPEG Start
+EOI = b'\xff\xd9' # JPEG End
+
+def parse_boundary(content_type):
+    """Boundary from a 'multipart/x-mixed-replace; boundary=...' header, or None."""
+    for param in (content_type or "").split(";"):
+        name, _, value = param.strip().partition("=")
+        if name.lower() == "boundary" and value:
+            return value.strip('"')
+    return None
+
+class MJPEGParser:
+    """
+    Incremental MJPEG parser that runs in linear time.
+
+    Chunks are appended to one growable bytearray and consumed by moving an
+    offset. Searches resume where the previous one stopped, so each byte is
+    copied and scanned about once no matter how the stream is chunked. Each
+    part is sliced using its multipart boundary and Content-Length header. If
+    the stream has no boundary, or a part has no Content-Length, the parser
+    falls back to scanning for JPEG SOI/EOI markers or the next boundary.
+    """
+    def __init__(self, boundary=None, max_buffer=8 * 1024 * 1024):
+        """
+        Args:
+            boundary (str): Multipart boundary from the response Content-Type, if any.
+            max_buffer (int): If this many bytes pass without a boundary, switch to marker scanning.
+        """
+        self.boundary = boundary.encode() if boundary else None
+        self.max_buffer = max_buffer
+        self.buf = bytearray()
+        self.pos = 0 # Start of unconsumed data
+        self.scan = 0 # Where the next search resumes
+        self.body_start = None # Start of the current part's body (boundary mode)
+        self.length = None # Its Content-Length, if given
+        self.soi = None # Start of the current JPEG (marker mode)
+        self.frames = 0
+        self.bytes = 0
+
+    def feed(self, data):
+        """
+        Add received bytes.
+
+        Returns:
+            list: Complete JPEG images (bytes) found so far, oldest first.
+        """
+        self.buf += data
+        self.bytes += len(data)
+        frames = []
+        while True:
+            frame = self._next_by_boundary() if self.boundary else self._next_by_markers()
+            if frame is None:
+                break
+            frames.append(frame)
+        self._compact()
+        self.frames += len(frames)
+        return frames
+
+    def _take(self, start, end):
+        """Copy one frame out; the memoryview must be released before the bytearray is resized."""
+        with memoryview(self.buf) as view:
+            frame = bytes(view[start:end])
+        self.pos = self.scan = end
+        return frame
+
+    def _next_by_boundary(self):
+        buf = self.buf
+        if self.body_start is None:
+            i = buf.find(self.boundary, self.scan)
+            if i == -1:
+                self.scan = max(self.pos, len(buf) - len(self.boundary) + 1)
+                if len(buf) - self.pos > self.max_buffer:
+                    print("MJPEG: no multipart boundary found, falling back to JPEG marker scanning")
+                    self.boundary = None
+                    self.scan = self.pos
+                return None
+            j = buf.find(b"\r\n\r\n", i)
+            if j == -1:
+                self.scan = i # Headers incomplete; they are short, so re-reading them is cheap
+                return None
+
+            self.length = None
+            for line in bytes(buf[i + len(self.boundary):j]).split(b"\r\n"):
+                name, _, value = line.partition(b":")
+                if name.strip().lower() == b"content-length":
+                    try:
+                        self.length = int(value)
+                    except ValueError:
+                        pass
+            self.body_start = self.scan = j + 4
+
+        if self.length is not None:
+            end = self.body_start + self.length
+            if len(buf) < end:
+                return None
+        else:
+            end = buf.find(self.boundary, self.scan)
+            if end == -1:
+                self.scan = max(self.body_start, len(buf) - len(self.boundary) + 1)
+                return None
+            if buf[end - 2:end] == b"--": # Delimiter dashes when the boundary was given without them
+                end -= 2
+            while end > self.body_start and buf[end - 1] in (0x0A, 0x0D): # Trailing CRLF
+                end -= 1
+
+        frame = self._take(self.body_start, end)
+        self.body_start = None
+        return frame
+
+    def _next_by_markers(self):
+        buf = self.buf
+        if self.soi is None:
+            a = buf.find(SOI, self.scan)
+            if a == -1:
+                # Nothing but garbage so far; keep one byte in case a marker is split
+                self.pos = self.scan = max(self.pos, len(buf) - 1)
+                return None
+            self.soi = a
+            self.scan = a + 2
+
+        b = buf.find(EOI, self.scan) # JPEG End (must be after start)
+        if b == -1:
+            self.scan = max(self.soi + 2, len(buf) - 1)
+            return None
+
+        frame = self._take(self.soi, b + 2)
+        self.soi = None
+        return frame
+
+    def _compact(self):
+        """Drop consumed bytes, keeping offsets relative to the new buffer start."""
+        if self.pos == 0:
+            return
+        shift = self.pos
+        del self.buf[:shift]
+        self.pos = 0
+        self.scan -= shift
+        if self.body_start is not None:
+            self.body_start -= shift
+        if self.soi is not None:
+            self.soi -= shift
+
+REDUCED_DECODE_FLAGS = {
+    1: cv2.IMREAD_COLOR,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+}
+
 class MJPEGStreamer:
     """
     Robust MJPEG stream client that runs in a separate thread.
     Ensures the main recognition loop always gets the freshest frame.
+
+    The thread only parses; it keeps the newest encoded JPEG and read() decodes
+    it on demand, so frames that are replaced before anyone reads them are never
+    decoded. libjpeg can decode directly at 1/2, 1/4 or 1/8 scale (DCT scaling),
+    which is much cheaper than decoding in full and resizing.
     """
-    def __init__(self, url):
+    def __init__(self, url, read_size=16384, reduce=1, max_width=None):
+        """
+        Args:
+            url (str): Stream URL, e.g. http://<esp32-ip>:81/stream
+            read_size (int): Bytes requested per socket read.
+            reduce (int): Decode at 1/reduce resolution (1, 2, 4 or 8).
+            max_width (int): Instead of `reduce`, pick the largest reduction that keeps
+                frames at least this wide (decided from the first frame).
+        """
+        if reduce not in REDUCED_DECODE_FLAGS:
+            raise ValueError(f"reduce must be one of {list(REDUCED_DECODE_FLAGS)}")
         self.url = url
-        self.frame = None
+        self.read_size = read_size
+        self.reduce = reduce
+        self.max_width = max_width
+        self.jpeg = None # Newest encoded frame
+        self.jpeg_seq = 0 # Number of JPEGs received, also the newest frame's sequence number
+        self.jpeg_time = 0.0 # Its arrival time (time.perf_counter())
+        self.frame = None # Last decoded frame
+        self.frame_seq = 0 # jpeg_seq of self.frame
+        self.decoded = 0
+        self.skipped = 0 # Frames replaced before being decoded
         self.stopped = False
         self.thread = threading.Thread(target=self._update, args=())
         self.thread.daemon = True
         self.lock = threading.Lock()
+        self.new_frame = threading.Condition(self.lock)
+        self.decode_lock = threading.Lock()
         
     def start(self):
         print(f"Starting MJPEG stream from: {self.url}")
@@ -34,45 +211,105 @@ class MJPEGStreamer:
                     print("Check if the URL path (e.g. /stream) and PORT are correct for your ESP32 sketch.")
                 return
 
-            bytes_buffer = bytes()
-            for chunk in stream.iter_content(chunk_size=1024):
+            parser = MJPEGParser(parse_boundary(stream.headers.get('Content-Type')))
+            for chunk in self._chunks(stream):
                 if self.stopped:
                     break
                 
-                bytes_buffer += chunk
-                
-                while True:
-                    a = bytes_buffer.find(b'\xff\xd8') # JPEG Start
-                    if a == -1:
-                        break
-                    
-                    b = bytes_buffer.find(b'\xff\xd9', a) # JPEG End (must be after start)
-                    if b == -1:
-                        break
-                        
-                    jpg = bytes_buffer[a:b+2]
-                    bytes_buffer = bytes_buffer[b+2:]
-                    
-                    if len(jpg) > 0:
-                        # Decode image
-                        img = cv2.imdecode(np.frombuffer(jpg, dtype=np.uint8), cv2.IMREAD_COLOR)
-                        
-                        if img is not None:
-                            with self.lock:
-                                self.frame = img
+                frames = parser.feed(chunk)
+                if frames:
+                    with self.lock:
+                        # Older frames in this batch, and the previous newest one if nobody read it, are never decoded
+                        self.skipped += len(frames) - 1
+                        if self.jpeg is not None and self.frame_seq != self.jpeg_seq:
+                            self.skipped += 1
+                        self.jpeg = frames[-1]
+                        self.jpeg_seq += len(frames)
+                        self.jpeg_time = time.perf_counter()
+                        self.new_frame.notify_all()
                         
         except Exception as e:
             print(f"Stream error: {e}")
         finally:
             self.stopped = True
+            with self.new_frame:
+                self.new_frame.notify_all()
+
+    def _chunks(self, stream):
+        """
+        Yield data as soon as it arrives, up to read_size bytes at a time. iter_content()
+        waits until a whole chunk is filled, which delays small frames.
+        """
+        raw = stream.raw
+        if not hasattr(raw, "read1"): # urllib3 < 2
+            yield from stream.iter_content(chunk_size=self.read_size)
+            return
+        while True:
+            data = raw.read1(self.read_size)
+            if not data:
+                return
+            yield data
+
+    def _decode(self, jpeg):
+        img = cv2.imdecode(np.frombuffer(jpeg, dtype=np.uint8), REDUCED_DECODE_FLAGS[self.reduce])
+        if img is not None and self.max_width:
+            # First frame: choose the reduction for the working resolution
+            native_width = img.shape[1] * self.reduce
+            reduce = 1
+            while reduce < 8 and native_width // (reduce * 2) >= self.max_width:
+                reduce *= 2
+            self.max_width = None
+            if reduce != self.reduce:
+                print(f"MJPEG: decoding at 1/{reduce} of {native_width}px width")
+                self.reduce = reduce
+                img = cv2.imdecode(np.frombuffer(jpeg, dtype=np.uint8), REDUCED_DECODE_FLAGS[reduce])
+        return img
 
     def read(self):
-        """Returns the latest frame and a success boolean."""
-        with self.lock:
+        """Returns the latest frame and a success boolean. Decodes only if a newer JPEG arrived."""
+        with self.decode_lock:
+            with self.lock:
+                jpeg, seq = self.jpeg, self.jpeg_seq
+            if seq != self.frame_seq and jpeg is not None:
+                img = self._decode(jpeg)
+                self.decoded += 1
+                if img is not None: # Keep showing the previous frame if this one is corrupt
+                    self.frame = img
+                with self.lock:
+                    self.frame_seq = seq
             if self.frame is None:
                 return False, None
             return True, self.frame.copy()
 
+    def read_new(self, timeout=1.0):
+        """
+        Wait for a frame newer than the last one read and hand it over without copying.
+        Unlike read(), the same frame is never returned twice.
+
+        Returns:
+            CapturedFrame: The frame, or None on timeout, end of stream or a corrupt JPEG.
+        """
+        with self.decode_lock:
+            with self.new_frame:
+                if not self.new_frame.wait_for(lambda: self.jpeg_seq > self.frame_seq or self.stopped, timeout):
+                    return None
+                if self.jpeg_seq <= self.frame_seq:
+                    return None
+                jpeg, seq, timestamp = self.jpeg, self.jpeg_seq, self.jpeg_time
+                self.frame_seq = seq
+
+            img = self._decode(jpeg)
+            self.decoded += 1
+            if img is None:
+                return None
+            self.frame = img # Shared with the caller; read() still returns copies
+            return CapturedFrame(seq, timestamp, img)
+
+    def stats(self):
+        """Counts of received, decoded and never-decoded frames."""
+        with self.lock:
+            return {"received": self.jpeg_seq, "decoded": self.decoded, "skipped": self.skipped}
+
     def stop(self):
         self.stopped = True
         self.thread.join(timeout=1)
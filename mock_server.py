@@ -1,42 +1,151 @@
-import http.server
-import socketserver
+import os
+import glob
 import time
+import random
+import threading
+import argparse
+import http.server
 import cv2
 import numpy as np
 
-# A simple MJPEG server for testing
+DATA_PATH = os.path.join("data", "raw")
+
+def load_frames(videos=None, width=640, height=480, quality=80, max_frames=600):
+    """
+    Decode, resize and JPEG-encode the replay frames once, so serving a client
+    costs only socket writes.
+
+    Args:
+        videos (list): Video files (default: data/raw/<word>/*.mp4). With no videos
+            a synthetic moving square is served instead.
+        max_frames (int): Upper bound on cached frames across all videos.
+
+    Returns:
+        list: Encoded JPEG frames as bytes.
+    """
+    if videos is None:
+        videos = sorted(glob.glob(os.path.join(DATA_PATH, "*", "*.mp4")))
+    params = [cv2.IMWRITE_JPEG_QUALITY, quality]
+    frames = []
+    for path in videos:
+        cap = cv2.VideoCapture(path)
+        while len(frames) < max_frames:
+            success, img = cap.read()
+            if not success:
+                break
+            if img.shape[1] != width or img.shape[0] != height:
+                img = cv2.resize(img, (width, height), interpolation=cv2.INTER_AREA)
+            frames.append(cv2.imencode('.jpg', img, params)[1].tobytes())
+        cap.release()
+
+    if not frames:
+        # A simple dummy stream: a moving square
+        img = np.zeros((height, width, 3), dtype=np.uint8)
+        for i in range(min(max_frames, 100)):
+            frame = img.copy()
+            x = (i * 12) % max(width - 50, 1)
+            cv2.rectangle(frame, (x, height // 2 - 25), (x + 50, height // 2 + 25), (0, 255, 0), -1)
+            frames.append(cv2.imencode('.jpg', frame, params)[1].tobytes())
+    return frames
+
+
 class MJPEGHandler(http.server.BaseHTTPRequestHandler):
+    """Streams the server's cached frames on /stream, paced per client."""
     def do_GET(self):
-        if self.path == '/stream':
-            self.send_response(200)
-            self.send_header('Content-type', 'multipart/x-mixed-replace; boundary=frame')
-            self.end_headers()
-            
-            # Create a simple dummy image
-            img = np.zeros((480, 640, 3), dtype=np.uint8)
-            
-            try:
-                while True:
-                    # Draw a moving square
-                    frame = img.copy()
-                    t = int(time.time() * 100) % 600
-                    cv2.rectangle(frame, (t, 200), (t+50, 250), (0, 255, 0), -1)
-                    
-                    _, jpeg = cv2.imencode('.jpg', frame)
-                    self.wfile.write(b'--frame\r\n')
-                    self.send_header('Content-type', 'image/jpeg')
-                    self.send_header('Content-length', str(len(jpeg)))
-                    self.end_headers()
-                    self.wfile.write(jpeg.tobytes())
-                    self.wfile.write(b'\r\n')
-                    time.sleep(0.05)
-            except Exception as e:
-                print(f"Client disconnected: {e}")
-
-def run_server(port=8080):
-    with socketserver.TCPServer(("", port), MJPEGHandler) as httpd:
-        print(f"Mock MJPEG server running at http://localhost:{port}/stream")
-        httpd.serve_forever()
+        if self.path != '/stream':
+            self.send_error(404)
+            return
+
+        server = self.server
+        self.send_response(200)
+        self.send_header('Content-type', 'multipart/x-mixed-replace; boundary=frame')
+        self.end_headers()
+
+        frames = server.frames
+        index = random.randrange(len(frames)) if server.stagger else 0 # Clients don't all show the same frame
+        interval = 1.0 / server.fps
+        next_time = time.perf_counter()
+        with server.lock:
+            server.clients += 1
+            print(f"Client connected from {self.client_address[0]} ({server.clients} streaming)")
+        try:
+            while True:
+                jpeg = frames[index]
+                self.wfile.write(b'--frame\r\nContent-type: image/jpeg\r\nContent-length: '
+                                 + str(len(jpeg)).encode() + b'\r\n\r\n' + jpeg + b'\r\n')
+                self.wfile.flush()
+                server.frames_sent += 1
+                index = (index + 1) % len(frames)
+
+                # Schedule against a fixed clock so write time doesn't lower the frame rate
+                next_time += interval
+                delay = next_time - time.perf_counter()
+                if server.jitter:
+                    delay += random.uniform(-server.jitter, server.jitter)
+                if server.stall_prob and random.random() < server.stall_prob:
+                    delay += server.stall # Simulated Wi-Fi dropout; frames are lost, not queued
+                    next_time = time.perf_counter() + delay
+                if delay > 0:
+                    time.sleep(delay)
+                elif delay < -1.0:
+                    next_time = time.perf_counter() # Client too slow; don't burst to catch up
+        except (BrokenPipeError, ConnectionResetError) as e:
+            print(f"Client disconnected: {e}")
+        finally:
+            with server.lock:
+                server.clients -= 1
+
+    def log_message(self, format, *args):
+        pass # One line per request is noise with many clients
+
+
+class MockMJPEGServer(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, frames, fps=20.0, jitter=0.0, stall_prob=0.0, stall=0.0, stagger=True):
+        """
+        Args:
+            frames (list): Encoded JPEGs from load_frames().
+            jitter (float): Random +/- seconds added to each frame interval.
+            stall_prob (float): Chance per frame of pausing the stream for `stall` seconds.
+            stagger (bool): Start each client at a random frame.
+        """
+        super().__init__(address, MJPEGHandler)
+        self.frames = frames
+        self.fps = fps
+        self.jitter = jitter
+        self.stall_prob = stall_prob
+        self.stall = stall
+        self.stagger = stagger
+        self.clients = 0
+        self.lock = threading.Lock()
+        self.frames_sent = 0
+
+def run_server(port=8080, videos=None, fps=20.0, width=640, height=480, quality=80, max_frames=600,
+               jitter=0.0, stall_prob=0.0, stall=0.0):
+    frames = load_frames(videos, width, height, quality, max_frames)
+    avg_kb = sum(len(f) for f in frames) / len(frames) / 1024
+    print(f"Cached {len(frames)} frames at {width}x{height}, quality {quality} ({avg_kb:.0f} KB/frame)")
+    with MockMJPEGServer(("", port), frames, fps, jitter, stall_prob, stall) as httpd:
+        print(f"Mock MJPEG server running at http://localhost:{port}/stream ({fps:g} FPS per client)")
+        try:
+            httpd.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        print(f"Sent {httpd.frames_sent} frames.")
 
 if __name__ == "__main__":
-    run_server()
+    parser = argparse.ArgumentParser(description="MJPEG test server replaying videos to any number of clients")
+    parser.add_argument("videos", nargs="*", help="Video files to replay (default: data/raw/<word>/*.mp4, else a synthetic square)")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--fps", type=float, default=20.0, help="Frames per second per client")
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=480)
+    parser.add_argument("--quality", type=int, default=80, help="JPEG quality")
+    parser.add_argument("--max-frames", type=int, default=600, help="Frames cached in memory")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Random +/- delay added to each frame")
+    parser.add_argument("--stall-prob", type=float, default=0.0, help="Chance per frame of a stall")
+    parser.add_argument("--stall-ms", type=float, default=2000.0, help="Length of each stall")
+    args = parser.parse_args()
+    run_server(args.port, args.videos or None, args.fps, args.width, args.height, args.quality, args.max_frames,
+               args.jitter_ms / 1000.0, args.stall_prob, args.stall_ms / 1000.0)
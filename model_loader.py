@@ -1,28 +1,24 @@
 import numpy as np
 
-# Try importing tflite_runtime, fallback to tensorflow if not available
-try:
-    import tflite_runtime.interpreter as tflite
-except ImportError:
-    try:
-        import tensorflow.lite as tflite
-    except ImportError:
-        raise ImportError("Neither tflite_runtime nor tensorflow is installed.")
+from tflite_utils import create_interpreter, is_quantized, quantize, dequantize
+
+NUM_LANDMARK_VALUES = 63 # 21 landmarks * (x, y, z)
 
 class ModelLoader:
     """
     Handles loading the TFLite model and running inference.
     """
-    def __init__(self, model_path="model.tflite"):
+    def __init__(self, model_path="model.tflite", num_threads=None, use_xnnpack=True, autotune=False):
         """
         Load the TFLite model.
         
         Args:
             model_path (str): Path to the .tflite model file.
+            num_threads, use_xnnpack, autotune: Interpreter settings, see tflite_utils.create_interpreter.
         """
         try:
-            self.interpreter = tflite.Interpreter(model_path=model_path)
-            self.interpreter.allocate_tensors()
+            self.interpreter = create_interpreter(model_path, num_threads=num_threads,
+                                                  use_xnnpack=use_xnnpack, autotune=autotune)
             
             self.input_details = self.interpreter.get_input_details()
             self.output_details = self.interpreter.get_output_details()
@@ -34,45 +30,96 @@ class ModelLoader:
             print(f"Error loading model from {model_path}: {e}")
             raise
 
+        self.input_detail = self.input_details[0]
+        self.output_detail = self.output_details[0]
+        self.input_index = self.input_detail['index']
+        self.output_index = self.output_detail['index']
+        self.input_quantized = is_quantized(self.input_detail)
+        self.batch_size = 1
+
+        # The feature adapter is fixed by the model, so work it out once: which of the
+        # 63 landmark values feed the model, in order. A 42-feature model takes (x, y)
+        # only; any further model inputs stay zero (padding).
+        self.num_features = int(self.input_detail['shape'][-1])
+        if self.num_features == 42:
+            self.feature_index = np.arange(NUM_LANDMARK_VALUES).reshape(21, 3)[:, :2].reshape(-1)
+        else:
+            self.feature_index = np.arange(min(self.num_features, NUM_LANDMARK_VALUES))
+        if self.num_features != 42 and self.num_features != NUM_LANDMARK_VALUES:
+            print(f"Warning: model expects {self.num_features} features; landmarks will be padded/truncated.")
+        self.input_buffer = np.zeros((1, self.num_features), dtype=np.float32)
+
+        num_classes = int(self.output_detail['shape'][-1])
+        if num_classes != len(self.labels):
+            print(f"Warning: model has {num_classes} classes but {len(self.labels)} labels; "
+                  f"extra classes are reported by index.")
+
+    def _label(self, index):
+        return self.labels[index] if index < len(self.labels) else str(index)
+
+    def _resize(self, batch_size):
+        """Resize the input tensor to a new batch dimension."""
+        self.interpreter.resize_tensor_input(self.input_index, (batch_size, self.num_features))
+        self.interpreter.allocate_tensors()
+        self.batch_size = batch_size
+
+    def _invoke(self, input_data):
+        """Set an input batch (float features), resizing the interpreter if needed, and invoke."""
+        if len(input_data) != self.batch_size:
+            self._resize(len(input_data))
+        # Full-integer models take and return quantized tensors
+        if self.input_quantized:
+            input_data = quantize(input_data, self.input_detail)
+        self.interpreter.set_tensor(self.input_index, input_data)
+        self.interpreter.invoke()
+        return dequantize(self.interpreter.get_tensor(self.output_index), self.output_detail)
+
     def predict(self, landmarks):
         """
         Run inference on the provided landmarks.
         
         Args:
-            landmarks (list): List of 63 float values (flattend x, y, z).
+            landmarks (list or np.ndarray): 63 float values (flattened x, y, z), or a (21, 3) array.
             
         Returns:
             str: Predicted letter (A-Z).
         """
-        input_data = np.array(landmarks, dtype=np.float32)
-        
-        expected_shape = self.input_details[0]['shape']
-        expected_cols = expected_shape[1]
-        
-        # If model expects 42 features (21 * 2), convert 63 (21 * 3) to 42 by dropping Z
-        if expected_cols == 42 and len(input_data) == 63:
-            # Reshape to (21, 3), take first 2 cols (x,y), flatten
-            input_data = input_data.reshape(21, 3)[:, :2].flatten()
-        
-        # Add batch dimension
-        input_data = np.array([input_data], dtype=np.float32)
-
-        # Handle any other dimension mismatch (e.g. padding if needed, though we expect 42 now)
-        if input_data.shape[1] != expected_cols:
-             print(f"Warning: Input shape {input_data.shape} does not match expected {expected_shape}. Padding/Truncating.")
-             # Fallback padding/truncating logic could go here if needed
-             if input_data.shape[1] < expected_cols:
-                 padded = np.zeros((1, expected_cols), dtype=np.float32)
-                 padded[:, :input_data.shape[1]] = input_data
-                 input_data = padded
-             else:
-                 input_data = input_data[:, :expected_cols]
-
-        self.interpreter.set_tensor(self.input_details[0]['index'], input_data)
-        self.interpreter.invoke()
-        
-        output_data = self.interpreter.get_tensor(self.output_details[0]['index'])
+        values = np.asarray(landmarks, dtype=np.float32).reshape(-1)
+        if values.size != NUM_LANDMARK_VALUES:
+            raise ValueError(f"Expected {NUM_LANDMARK_VALUES} landmark values, got {values.size}")
+        np.take(values, self.feature_index, out=self.input_buffer[0, :len(self.feature_index)])
+
+        output_data = self._invoke(self.input_buffer)
 
         prediction_index = np.argmax(output_data)
         
-        return self.labels[prediction_index]
+        return self._label(prediction_index)
+
+    def predict_batch(self, landmarks, max_batch=1024):
+        """
+        Classify many frames, e.g. a whole video or dataset, with one interpreter
+        call per `max_batch` frames.
+
+        Args:
+            landmarks (np.ndarray): (N, 63) or (N, 21, 3) landmark values.
+            max_batch (int): Largest batch given to the interpreter at once.
+
+        Returns:
+            tuple: (list of N predicted letters, (N, num_classes) float class probabilities)
+        """
+        values = np.asarray(landmarks, dtype=np.float32)
+        if len(values) == 0:
+            return [], np.zeros((0, int(self.output_detail['shape'][-1])), np.float32)
+        values = values.reshape(len(values), -1)
+        if values.shape[1] != NUM_LANDMARK_VALUES:
+            raise ValueError(f"Expected {NUM_LANDMARK_VALUES} landmark values per frame, got {values.shape[1]}")
+        features = np.zeros((len(values), self.num_features), dtype=np.float32)
+        features[:, :len(self.feature_index)] = values[:, self.feature_index]
+
+        probs = [self._invoke(features[i:i + max_batch]) for i in range(0, len(features), max_batch)]
+        probs = np.concatenate(probs)
+        return [self._label(i) for i in np.argmax(probs, axis=1)], probs
+
+    def warmup(self):
+        """Run one invoke() on zeroed input so the first real prediction is not slowed by lazy initialization."""
+        self._invoke(self.input_buffer)
@@ -0,0 +1,252 @@
+import time
+import queue
+import argparse
+import threading
+
+import numpy as np
+
+from hand_tracker import HandTracker
+from gesture_recognizer import GestureRecognizer, SequenceBuffer, WordDebouncer
+from mjpeg_streamer import MJPEGStreamer
+from landmark_protocol import LandmarkReceiver, DEFAULT_PORT
+
+
+class StreamState:
+    """
+    Per-stream state: landmark window, debounce/cooldown and word output.
+    """
+    def __init__(self, name, speech=None, sequence_length=30):
+        self.name = name
+        self.speech = speech
+        self.sequence_buffer = SequenceBuffer(sequence_length)
+        self.debouncer = WordDebouncer()
+        self.pending = False # A window from this stream is waiting in the batcher
+        self.lock = threading.Lock()
+
+    def add_landmarks(self, landmarks, batcher):
+        """Append one frame (None = hand lost) and submit the window once it is full."""
+        with self.lock:
+            if landmarks is not None:
+                self.sequence_buffer.append(landmarks)
+                # Only one window per stream in flight; newer frames keep filling the buffer
+                if self.sequence_buffer.is_full() and not self.pending:
+                    self.pending = True
+                    batcher.submit(self, self.sequence_buffer.window())
+            else:
+                self.sequence_buffer.clear()
+
+    def on_prediction(self, prediction):
+        """Called by the batcher with the result for this stream's window."""
+        with self.lock:
+            self.pending = False
+            word = self.debouncer.update(prediction)
+        if word:
+            print(f"[{self.name}] Matched Word: {word}")
+            if self.speech:
+                self.speech.say(word)
+
+
+class BatchedInference:
+    """
+    Gathers ready windows from all streams and runs them through the LSTM in a
+    single interpreter call, resizing its (1, 30, 63) input to (N, 30, 63).
+    """
+    def __init__(self, recognizer, max_batch=8, batch_timeout=0.01):
+        """
+        Args:
+            recognizer (GestureRecognizer): Shared model used for batched calls.
+            max_batch (int): Largest batch sent to the interpreter.
+            batch_timeout (float): Seconds to wait for more windows after the first one arrives.
+        """
+        self.recognizer = recognizer
+        self.max_batch = max_batch
+        self.batch_timeout = batch_timeout
+        self.requests = queue.Queue()
+        self.stopped = False
+        self.batches = 0
+        self.windows = 0
+        self.thread = threading.Thread(target=self._run)
+        self.thread.daemon = True
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def submit(self, stream, window):
+        """Queue a (30, 63) window; the result goes to stream.on_prediction()."""
+        self.requests.put((stream, window))
+
+    def _run(self):
+        while not self.stopped:
+            try:
+                batch = [self.requests.get(timeout=0.1)]
+            except queue.Empty:
+                continue
+
+            deadline = time.perf_counter() + self.batch_timeout
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self.requests.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            streams = [stream for stream, _ in batch]
+            try:
+                predictions = self.recognizer.predict_batch(np.stack([window for _, window in batch]))
+            except Exception as e:
+                print(f"Batched inference error: {e}")
+                predictions = [None] * len(batch)
+
+            self.batches += 1
+            self.windows += len(batch)
+            for stream, prediction in zip(streams, predictions):
+                stream.on_prediction(prediction)
+
+    def stop(self):
+        self.stopped = True
+        self.thread.join(timeout=1)
+
+
+def run_stream(stream, cap, tracker, batcher, stop_event):
+    """Capture and hand detection loop for one camera."""
+    while not stop_event.is_set() and cap.isOpened():
+        frame = cap.read_new(timeout=0.5) # Each frame once; no duplicates in the window
+        if frame is None:
+            continue
+
+        tracker.find_hands(frame.image, draw=False, timestamp_ms=frame.timestamp * 1000.0)
+        stream.add_landmarks(tracker.get_landmark_array(), batcher)
+
+def listen(args, recognizer, batcher, speech):
+    """
+    Receive landmarks from edge devices running landmark_sender.py. Each
+    (sender address, stream id) gets its own StreamState on first contact.
+    """
+    streams = {}
+    lock = threading.Lock()
+
+    def on_message(message, address):
+        key = (address[0], message.stream_id)
+        with lock:
+            stream = streams.get(key)
+            if stream is None:
+                stream = StreamState(f"{address[0]}#{message.stream_id}", speech=speech,
+                                     sequence_length=recognizer.sequence_length)
+                streams[key] = stream
+                print(f"New landmark stream {stream.name}")
+        stream.add_landmarks(message.landmarks, batcher)
+
+    receiver = LandmarkReceiver(on_message, host=args.listen_host, port=args.listen, transport=args.transport).start()
+    print(f"Listening for landmarks on {args.transport}://{args.listen_host}:{receiver.port}")
+    return receiver
+
+def start_async_ingest(args, recognizer, batcher, speech):
+    """
+    Read every --source on a single asyncio loop instead of one thread per camera.
+    Fresh frames are tracked on a small worker pool; a stream never has more than
+    one frame in flight, so each tracker is only used by one thread at a time.
+    """
+    from async_ingest import AsyncIngest
+
+    states, trackers = {}, {}
+
+    def on_frame(stream, frame):
+        tracker = trackers[stream.name]
+        tracker.find_hands(frame.image, draw=False, timestamp_ms=frame.timestamp * 1000.0)
+        states[stream.name].add_landmarks(tracker.get_landmark_array(), batcher)
+
+    ingest = AsyncIngest(on_frame=on_frame, workers=args.ingest_workers).start()
+    for i, url in enumerate(args.source):
+        name = f"cam{i}"
+        states[name] = StreamState(name, speech=speech, sequence_length=recognizer.sequence_length)
+        trackers[name] = HandTracker(detection_con=0.7, max_hands=1, running_mode="video")
+        ingest.add_stream(url, name=name, max_age=args.max_frame_age_ms / 1000.0)
+    return ingest, trackers
+
+def main():
+    parser = argparse.ArgumentParser(description="Sign2Speech multi-camera server with batched LSTM inference")
+    parser.add_argument("--source", action="append", default=[], help="MJPEG stream URL (repeat for each camera)")
+    parser.add_argument("--listen", type=int, nargs="?", const=DEFAULT_PORT, default=None,
+                        help=f"Also accept landmark streams from landmark_sender.py on this port (default {DEFAULT_PORT})")
+    parser.add_argument("--listen-host", type=str, default="0.0.0.0", help="Interface for --listen")
+    parser.add_argument("--transport", choices=["udp", "tcp"], default="udp", help="Landmark transport for --listen")
+    parser.add_argument("--async-ingest", action="store_true",
+                        help="Read all --source streams on one asyncio loop and run tracking on a worker pool")
+    parser.add_argument("--ingest-workers", type=int, default=4, help="Tracking threads for --async-ingest")
+    parser.add_argument("--max-frame-age-ms", type=float, default=500.0,
+                        help="With --async-ingest, drop frames older than this instead of tracking them")
+    parser.add_argument("--max-batch", type=int, default=8, help="Largest number of windows per interpreter call")
+    parser.add_argument("--batch-timeout-ms", type=float, default=10.0, help="How long to wait for more windows before running a partial batch")
+    parser.add_argument("--speak", action="store_true", help="Speak recognized words on this machine (shared audio device)")
+    parser.add_argument("--report-interval", type=float, default=10.0, help="Seconds between batching reports")
+    args = parser.parse_args()
+    if not args.source and args.listen is None:
+        parser.error("give at least one --source or --listen")
+
+    recognizer = GestureRecognizer()
+    speech = None
+    if args.speak:
+        from speech_engine import SpeechEngine
+        speech = SpeechEngine(vocabulary=recognizer.labels)
+
+    batcher = BatchedInference(recognizer, max_batch=args.max_batch,
+                               batch_timeout=args.batch_timeout_ms / 1000.0).start()
+    stop_event = threading.Event()
+    workers = []
+
+    ingest, ingest_trackers = None, {}
+    if args.async_ingest and args.source:
+        ingest, ingest_trackers = start_async_ingest(args, recognizer, batcher, speech)
+
+    for i, url in enumerate(args.source if ingest is None else []):
+        stream = StreamState(f"cam{i}", speech=speech, sequence_length=recognizer.sequence_length)
+        cap = MJPEGStreamer(url).start()
+        # MediaPipe detectors are not shared across threads, so each stream gets its own
+        tracker = HandTracker(detection_con=0.7, max_hands=1, running_mode="video")
+        t = threading.Thread(target=run_stream, args=(stream, cap, tracker, batcher, stop_event), name=stream.name)
+        t.daemon = True
+        t.start()
+        workers.append((t, cap, tracker))
+
+    receiver = listen(args, recognizer, batcher, speech) if args.listen is not None else None
+
+    print(f"Serving {len(args.source)} camera streams. Press Ctrl+C to exit.")
+    try:
+        while True:
+            time.sleep(args.report_interval)
+            avg = batcher.windows / batcher.batches if batcher.batches else 0.0
+            report = f"[batcher] {batcher.batches} batches, {batcher.windows} windows, avg batch {avg:.2f}"
+            if receiver:
+                report += f" | {receiver.messages} landmark messages, {receiver.bytes_received / 1024:.1f} KB"
+            if ingest:
+                for name, stream in ingest.streams.items():
+                    st = stream.stats()
+                    report += (f" | {name}: {st['decoded']}/{st['received']} frames, {st['stale']} stale, "
+                               f"{st['reconnects']} reconnects")
+            if speech:
+                report += f" | speech {speech.stats()}"
+            print(report)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop_event.set()
+        if receiver:
+            receiver.stop()
+        if ingest:
+            ingest.stop()
+            for tracker in ingest_trackers.values():
+                tracker.close()
+        batcher.stop()
+        for t, cap, tracker in workers:
+            t.join(timeout=1)
+            cap.release()
+            tracker.close()
+        if speech:
+            speech.cleanup()
+        print("Server closed.")
+
+if __name__ == "__main__":
+    main()
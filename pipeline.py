@@ -0,0 +1,200 @@
+import collections
+import queue
+import threading
+import time
+
+
+class DropOldestQueue:
+    """
+    Bounded queue that discards its oldest item instead of blocking the producer.
+    Keeps fast stages (e.g. capture) from stalling behind slow ones.
+    """
+    def __init__(self, maxsize=2, on_drop=None):
+        """
+        Args:
+            maxsize (int): Maximum number of queued items.
+            on_drop (callable): Optional hook called with each dropped item.
+        """
+        self.maxsize = max(1, maxsize)
+        self.items = collections.deque()
+        self.cond = threading.Condition()
+        self.dropped = 0
+        self.on_drop = on_drop
+
+    def put(self, item):
+        """Enqueue an item, dropping the oldest one if the queue is full."""
+        dropped = None
+        with self.cond:
+            if len(self.items) >= self.maxsize:
+                dropped = self.items.popleft()
+                self.dropped += 1
+            self.items.append(item)
+            self.cond.notify()
+        if dropped is not None and self.on_drop:
+            self.on_drop(dropped)
+
+    def get(self, timeout=None):
+        """
+        Dequeue the oldest item.
+
+        Raises:
+            queue.Empty: If no item arrived within the timeout.
+        """
+        with self.cond:
+            if not self.cond.wait_for(lambda: self.items, timeout):
+                raise queue.Empty
+            return self.items.popleft()
+
+    def __len__(self):
+        with self.cond:
+            return len(self.items)
+
+
+class Stage:
+    """
+    A pipeline stage running its function on a dedicated worker thread.
+
+    A stage without an inbox is a source: its function is called repeatedly
+    with no argument and returns None when it has nothing to produce.
+    Otherwise it is called with each item from the inbox. Non-None results
+    are forwarded to the outbox.
+    """
+    def __init__(self, name, func, inbox=None, outbox=None):
+        self.name = name
+        self.func = func
+        self.inbox = inbox
+        self.outbox = outbox
+        self.processed = 0
+        self.busy_time = 0.0
+        self.stopped = False
+        self.thread = threading.Thread(target=self._run, name=f"stage-{name}")
+        self.thread.daemon = True
+
+        # Snapshot used to compute throughput between reports
+        self._last_count = 0
+        self._last_busy = 0.0
+        self._last_time = time.perf_counter()
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stopped = True
+
+    def join(self, timeout=None):
+        self.thread.join(timeout)
+
+    def _run(self):
+        while not self.stopped:
+            if self.inbox is not None:
+                try:
+                    item = self.inbox.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                args = (item,)
+            else:
+                args = ()
+
+            start = time.perf_counter()
+            try:
+                result = self.func(*args)
+            except Exception as e:
+                print(f"[{self.name}] stage error: {e}")
+                continue
+            self.busy_time += time.perf_counter() - start
+
+            # A source returning None had nothing to produce
+            if result is None and self.inbox is None:
+                continue
+
+            self.processed += 1
+            if result is not None and self.outbox is not None:
+                self.outbox.put(result)
+
+    def throughput(self):
+        """
+        Report throughput since the previous call.
+
+        Returns:
+            tuple: (items per second, fraction of wall time spent busy)
+        """
+        now = time.perf_counter()
+        count, busy = self.processed, self.busy_time
+        elapsed = max(now - self._last_time, 1e-6)
+        rate = (count - self._last_count) / elapsed
+        load = (busy - self._last_busy) / elapsed
+        self._last_count, self._last_busy, self._last_time = count, busy, now
+        return rate, load
+
+
+class Pipeline:
+    """
+    Chain of stages connected by drop-oldest queues.
+    """
+    def __init__(self, queue_size=2, on_drop=None):
+        """
+        Args:
+            queue_size (int): Capacity of each inter-stage queue.
+            on_drop (callable): Optional hook called with every item dropped between stages.
+        """
+        self.queue_size = queue_size
+        self.on_drop = on_drop
+        self.stages = []
+        self.queues = []
+        self.tail = None
+
+    def add_stage(self, name, func, source=False, inbox=None, sink=False):
+        """
+        Append a stage, by default fed by the previous stage's output.
+
+        Args:
+            name (str): Name used in throughput reports.
+            func (callable): Stage body. Return None to drop the item.
+            source (bool): True for a stage that pulls its own input.
+            inbox (DropOldestQueue): Explicit input queue for branching stages.
+            sink (bool): True if the stage's results are not forwarded.
+
+        Returns:
+            DropOldestQueue: The new stage's outbox, or None for a sink.
+        """
+        if inbox is None and not source:
+            inbox = self.tail
+        outbox = None if sink else DropOldestQueue(self.queue_size, self.on_drop)
+        self.stages.append(Stage(name, func, inbox, outbox))
+        self.queues.append(outbox)
+        if outbox is not None:
+            self.tail = outbox
+        return outbox
+
+    def start(self):
+        for stage in self.stages:
+            stage.start()
+        return self
+
+    def stop(self):
+        for stage in self.stages:
+            stage.stop()
+        for stage in self.stages:
+            stage.join(timeout=1)
+
+    def report(self):
+        """Build a one-line throughput summary for all stages."""
+        parts = []
+        for stage, outbox in zip(self.stages, self.queues):
+            rate, load = stage.throughput()
+            dropped = outbox.dropped if outbox is not None else 0
+            parts.append(f"{stage.name} {rate:5.1f}/s ({load * 100:3.0f}% busy, {dropped} dropped)")
+        return " | ".join(parts)
+
+
+class PipelineItem:
+    """Data carried through the pipeline for one captured frame."""
+    __slots__ = ("seq", "timestamp", "image", "landmarks", "status")
+
+    def __init__(self, seq, timestamp, image):
+        self.seq = seq
+        self.timestamp = timestamp
+        self.image = image
+        self.landmarks = None
+        self.status = "Listening..."
@@ -1,4 +1,5 @@
 import os
+import argparse
 import cv2
 import numpy as np
 import mediapipe as mp
@@ -17,11 +18,12 @@ def create_folders(actions):
         except OSError as e:
             print(f"Error creating directory for {action}: {e}")
 
-def extract_landmarks(tracker, image):
+def extract_landmarks(tracker, image, timestamp_ms=None):
     # Use existing tracker method but modify to return normalized relative coordinates
     # HandTracker.get_landmark_data returns absolute normalized (0-1) coordinates
     # We want them relative to the wrist (point 0) for better translation invariance
-    tracker.find_hands(image, draw=False)
+    tracker.find_hands(image, draw=False, timestamp_ms=timestamp_ms)
+    tracker.wait_for_result() # Live-stream mode: keep landmarks aligned with their frame
     results = tracker.results
     
     if results and results.hand_landmarks:
@@ -42,11 +44,11 @@ def extract_landmarks(tracker, image):
     
     return np.zeros(21*3) # Return zeroes if no hand detected
 
-def process_videos():
+def process_videos(tracker_mode="image"):
     actions = [name for name in os.listdir(DATA_PATH) if os.path.isdir(os.path.join(DATA_PATH, name))]
     create_folders(actions)
     
-    tracker = HandTracker(max_hands=1)
+    tracker = HandTracker(max_hands=1, running_mode=tracker_mode)
     
     for action in actions:
         action_path = os.path.join(DATA_PATH, action)
@@ -57,6 +59,9 @@ def process_videos():
         for video_file in video_files:
             video_path = os.path.join(action_path, video_file)
             cap = cv2.VideoCapture(video_path)
+            fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+            if tracker_mode != "image":
+                tracker.reset() # Don't carry a tracked hand over from the previous clip
             
             frames = []
             
@@ -65,7 +70,8 @@ def process_videos():
                 if not ret:
                     break
                 
-                landmarks = extract_landmarks(tracker, frame)
+                # Timestamps follow the video's own clock
+                landmarks = extract_landmarks(tracker, frame, timestamp_ms=len(frames) * 1000.0 / fps)
                 frames.append(landmarks)
             
             cap.release()
@@ -81,4 +87,8 @@ def process_videos():
             print(f"  Saved {npy_path}.npy (Frames: {len(frames)})")
 
 if __name__ == "__main__":
-    process_videos()
+    parser = argparse.ArgumentParser(description="Extract landmark sequences from data/raw videos")
+    parser.add_argument("--tracker-mode", choices=["image", "video", "live_stream"], default="image",
+                        help="MediaPipe running mode; 'video' tracks the hand across frames instead of re-detecting it")
+    args = parser.parse_args()
+    process_videos(args.tracker_mode)
@@ -0,0 +1,119 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from word_builder import WordBuilder
+
+
+class Fingerspeller:
+    """
+    Letter-by-letter mode: the static letter model (ModelLoader) feeds a
+    WordBuilder that confirms held letters and matches the buffer against its
+    vocabulary.
+    """
+    def __init__(self, model, stability_duration=1.0, lexicon=None):
+        """
+        Args:
+            model (ModelLoader): Letter classifier.
+            stability_duration (float): Seconds a letter must be held to be accepted.
+            lexicon (Lexicon): Words to spell; defaults to WordBuilder's built-in vocabulary.
+        """
+        self.model = model
+        self.builder = WordBuilder(stability_duration=stability_duration, lexicon=lexicon)
+
+    def process(self, landmarks):
+        """
+        Classify one frame's landmarks.
+
+        Args:
+            landmarks (np.ndarray): (21, 3) landmark array.
+
+        Returns:
+            tuple: (raw letter, completed vocabulary word or None)
+        """
+        letter = self.model.predict(landmarks)
+        self.builder.process_letter(letter)
+        # Checked every frame, not only on a new letter: a pause can complete a word
+        return letter, self.builder.check_word()
+
+    def status(self, letter):
+        """Overlay text: the raw letter, the spelled prefix and its top completions."""
+        text = f"Letter: {letter} [{self.builder.get_current_word()}]"
+        completions = self.builder.completions(k=3)
+        if completions:
+            text += " " + " ".join(completions)
+        return text
+
+
+class MultiModeRecognizer:
+    """
+    Runs the letter model and the whole-word LSTM on the same landmark stream.
+
+    With both enabled, the letter branch runs on a helper thread while the LSTM
+    runs on the caller's thread; TFLite releases the GIL during invoke(), so the
+    two models overlap instead of adding up.
+    """
+    def __init__(self, recognizer=None, speller=None, metrics=None):
+        """
+        Args:
+            recognizer (GestureRecognizer): Whole-word model, or None for letters only.
+            speller (Fingerspeller): Letter model, or None for words only.
+            metrics (Metrics): Optional registry for per-model timings.
+        """
+        from gesture_recognizer import WordDebouncer
+
+        self.recognizer = recognizer
+        self.speller = speller
+        self.metrics = metrics
+        self.debouncer = WordDebouncer()
+        self.pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="letters") if recognizer and speller else None
+
+    def _letters(self, landmarks):
+        if self.metrics:
+            with self.metrics.timer("letters"):
+                return self.speller.process(landmarks)
+        return self.speller.process(landmarks)
+
+    def _words(self, landmarks):
+        if self.metrics:
+            with self.metrics.timer("words"):
+                return self.recognizer.process_landmarks(landmarks)
+        return self.recognizer.process_landmarks(landmarks)
+
+    def process(self, landmarks):
+        """
+        Feed one frame's landmarks to every enabled model.
+
+        Args:
+            landmarks (np.ndarray): (21, 3) array, or None when no hand was found.
+
+        Returns:
+            tuple: (status text for the overlay, list of words to speak)
+        """
+        if landmarks is None:
+            self.clear()
+            return "No Hand", []
+
+        letters = self.pool.submit(self._letters, landmarks) if self.pool else None
+        status, words = [], []
+        if self.recognizer:
+            prediction = self._words(landmarks)
+            if prediction:
+                status.append(f"Recognized: {prediction}")
+            word = self.debouncer.update(prediction)
+            if word:
+                words.append(word)
+
+        if self.speller:
+            letter, word = letters.result() if letters else self._letters(landmarks)
+            status.append(self.speller.status(letter))
+            if word:
+                words.append(word)
+        return " | ".join(status) or "Listening...", words
+
+    def clear(self):
+        """The hand left the frame: drop the LSTM window (the spelled word is kept)."""
+        if self.recognizer:
+            self.recognizer.clear()
+
+    def close(self):
+        if self.pool:
+            self.pool.shutdown(wait=False)
@@ -12,6 +12,7 @@ sudo apt-get update && sudo apt-get upgrade -y
 echo "Installing system dependencies (OpenCV, MediaPipe, Speech)..."
 # libgl1-mesa-glx: needed for OpenCV
 # espeak-ng: needed for pyttsx3 speech engine
+# alsa-utils: aplay, plays the cached speech clips
 # libatlas-base-dev: needed for numpy/opencv
 sudo apt-get install -y \
     python3-pip \
@@ -19,6 +20,7 @@ sudo apt-get install -y \
     libgl1-mesa-glx \
     libatlas-base-dev \
     espeak-ng \
+    alsa-utils \
     portaudio19-dev
 
 # 3. Setup Virtual Environment
@@ -45,6 +47,9 @@ if ! python3 -c "import tensorflow" &> /dev/null && ! python3 -c "import tflite_
     pip install tensorflow-cpu
 fi
 
+# 6. Pre-render the vocabulary so words are played from cached clips
+python3 audio_cache.py --labels labels.txt || echo "Audio cache not built; it will be rendered on first run."
+
 echo "--- Setup Complete ---"
 echo "To run the application:"
 echo "source .venv/bin/activate"
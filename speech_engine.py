@@ -1,55 +1,199 @@
+import time
 import pyttsx3
 import threading
+import collections
+
+from metrics import RollingHistogram
+from audio_cache import AudioCache, AUDIO_CACHE_DIR
+
+# One queued phrase: its text and the time (time.perf_counter()) the word was recognized
+Utterance = collections.namedtuple("Utterance", ["text", "timestamp"])
+
 
 class SpeechEngine:
     """
     Handles text-to-speech operations using pyttsx3.
-    Designed to run speech in a way that doesn't block the main video loop efficiently.
+
+    A single long-lived worker thread owns the engine and speaks from a small
+    queue, so say() never blocks the video loop and words are spoken in order.
+    Repeated words are collapsed, and words that waited longer than max_age are
+    dropped instead of being spoken late.
+
+    Given a vocabulary, those words are pre-rendered into an AudioCache and played
+    back without running the synthesizer; other text is synthesized live and
+    added to the cache once the queue is idle.
     """
-    def __init__(self):
-        """Initialize the speech engine."""
+    def __init__(self, rate=150, volume=1.0, max_queue=4, max_age=2.0, metrics=None,
+                 vocabulary=None, cache_dir=AUDIO_CACHE_DIR, cache_size=64):
+        """
+        Initialize the speech engine.
+
+        Args:
+            max_queue (int): Waiting utterances kept; the oldest is dropped when full.
+            max_age (float): Seconds after recognition after which a word is no longer worth saying.
+            metrics (Metrics): Optional registry for recognition-to-audio latency and drop counters.
+            vocabulary (list): Words to pre-render at startup; None disables the audio cache.
+            cache_dir (str): Where rendered clips are stored between runs.
+            cache_size (int): Most clips kept before the least recently used is evicted.
+        """
         self.engine = pyttsx3.init()
-        # Set properties if needed, e.g., rate or volume
-        self.engine.setProperty('rate', 150)
-        self.engine.setProperty('volume', 1.0)
-        
-        # We need to run the engine loop. For pyttsx3, runAndWait is blocking.
-        # To make it non-blocking for the main loop, we can usually just call say() 
-        # and runAndWait() in a separate thread or use the engine's startLoop in a thread.
-        # However, repeatedly creating threads for each word is safe enough for low frequency.
-        # A more robust approach only for 'saying' one thing at a time:
+        self.engine.setProperty('rate', rate)
+        self.engine.setProperty('volume', volume)
+        self.engine.connect('started-utterance', self._on_started)
+        self.rate = rate
+        self.voice = self.engine.getProperty('voice')
+        self.max_queue = max_queue
+        self.max_age = max_age
+        self.metrics = metrics
+        self.vocabulary = list(vocabulary or [])
+        self.cache = None
+        if vocabulary is not None:
+            if AudioCache.can_play():
+                self.cache = AudioCache(cache_dir, max_entries=max(cache_size, len(self.vocabulary)))
+            else:
+                print("Audio cache disabled: install simpleaudio or aplay to play cached clips.")
+        self.to_render = set() # Live-synthesized text to add to the cache when idle
+
+        self.queue = collections.deque()
+        self.current = None # Utterance being spoken
+        self.latency = RollingHistogram(window=100)
+        self.counts = {"spoken": 0, "coalesced": 0, "stale": 0, "dropped": 0, "interrupted": 0}
+        self.stopped = False
         self.lock = threading.Lock()
+        self.not_empty = threading.Condition(self.lock)
+        self.thread = threading.Thread(target=self._run, name="speech")
+        self.thread.daemon = True
+        self.thread.start()
 
-    def say(self, text):
+    def say(self, text, timestamp=None, priority=False):
         """
-        Speak the given text.
-        
+        Queue text to be spoken. Returns immediately.
+
         Args:
             text (str): The text to convert to speech.
+            timestamp (float): When the word was recognized (time.perf_counter()); defaults to now.
+                Used for the max_age check and the latency report.
+            priority (bool): Discard queued words and interrupt the current one.
         """
-        # Run in a separate thread to prevent blocking the video processing loop
-        t = threading.Thread(target=self._speak_thread, args=(text,))
-        t.daemon = True
-        t.start()
+        utterance = Utterance(text, time.perf_counter() if timestamp is None else timestamp)
+        interrupt = False
+        with self.not_empty:
+            if priority:
+                self._count("dropped", len(self.queue))
+                self.queue.clear()
+                interrupt = self.current is not None
+                self.queue.append(utterance)
+            elif self.queue and self.queue[-1].text == text:
+                # Same word signed again before the first was spoken: say it once, as the fresher one
+                self.queue[-1] = utterance
+                self._count("coalesced")
+                return
+            elif not self.queue and self.current is not None and self.current.text == text:
+                self._count("coalesced")
+                return
+            else:
+                if len(self.queue) >= self.max_queue:
+                    self.queue.popleft()
+                    self._count("dropped")
+                self.queue.append(utterance)
+            self.not_empty.notify()
+        if interrupt:
+            try:
+                self.engine.stop()
+                if self.cache:
+                    self.cache.stop()
+                self._count("interrupted")
+            except Exception as e:
+                print(f"Speech interrupt error: {e}")
 
-    def _speak_thread(self, text):
-        """Internal method to run the speech command in a thread."""
-        with self.lock:
-            # We initialize a new engine instance per thread if the global one has issues 
-            # with threading, but pyttsx3 generally shares the driver. 
-            # However, for simple usage:
+    def _run(self):
+        """Worker: speak queued utterances one at a time."""
+        if self.cache:
+            self._render(self.vocabulary)
+        while True:
+            if self.to_render and not self.queue:
+                texts, self.to_render = list(self.to_render), set()
+                self._render(texts)
+            with self.not_empty:
+                while not self.queue and not self.stopped:
+                    self.not_empty.wait()
+                if self.stopped:
+                    return
+                utterance = self.queue.popleft()
+                if time.perf_counter() - utterance.timestamp > self.max_age:
+                    self._count("stale")
+                    continue
+                self.current = utterance
             try:
-                # Re-initializing inside thread is sometimes safer for certain drivers,
-                # but let's try using the shared instance first.
-                # Note: runAndWait() starts the event loop, iterates, and returns.
-                self.engine.say(text)
-                self.engine.runAndWait()
+                clip = self.cache.get(utterance.text, self.voice, self.rate) if self.cache else None
+                if clip is not None:
+                    self._on_started()
+                    self.cache.play(clip)
+                else:
+                    # runAndWait() starts the event loop, speaks, and returns
+                    self.engine.say(utterance.text)
+                    self.engine.runAndWait()
+                    if self.cache:
+                        self.to_render.add(utterance.text)
+                self._count("spoken")
             except RuntimeError:
                 # If loop is already running or other loop issues
                 pass
             except Exception as e:
                 print(f"Speech error: {e}")
+            finally:
+                with self.lock:
+                    self.current = None
+
+    def _render(self, texts):
+        """Render texts into the audio cache (worker thread only, as it uses the engine)."""
+        try:
+            rendered = self.cache.render(self.engine, texts, self.voice, self.rate)
+            if rendered:
+                print(f"Audio cache: rendered {rendered} clips")
+        except Exception as e:
+            print(f"Audio cache error: {e}")
+
+    def _on_started(self, name=None):
+        """Engine callback when audio for the current utterance starts."""
+        current = self.current
+        if current is None:
+            return
+        latency = time.perf_counter() - current.timestamp
+        self.latency.observe(latency)
+        if self.metrics:
+            self.metrics.observe("frame_to_speech", latency)
+
+    def _count(self, name, amount=1):
+        if amount:
+            self.counts[name] += amount
+            if self.metrics and name != "spoken":
+                self.metrics.inc(f"speech_{name}", amount)
+
+    def stats(self):
+        """
+        Returns:
+            dict: Queue depth, utterance counters and recognition-to-audio latency percentiles (ms).
+        """
+        with self.lock:
+            stats = dict(self.counts, queued=len(self.queue))
+        if self.cache:
+            stats.update({f"cache_{k}": v for k, v in self.cache.stats().items()})
+        for q, value in self.latency.percentiles().items():
+            stats[f"latency_p{int(q * 100)}_ms"] = round(value * 1000, 1)
+        return stats
+
+    def warmup(self):
+        """Load the driver's voice list now instead of on the first word."""
+        self.engine.getProperty('voices')
 
     def cleanup(self):
         """Cleanup resources."""
+        with self.not_empty:
+            self.stopped = True
+            self.queue.clear()
+            self.not_empty.notify()
         self.engine.stop()
+        if self.cache:
+            self.cache.stop()
+        self.thread.join(timeout=1)
@@ -0,0 +1,202 @@
+import os
+import json
+import time
+import hashlib
+import platform
+import tempfile
+import threading
+
+import numpy as np
+
+# Try importing tflite_runtime, fallback to tensorflow if not available
+try:
+    import tflite_runtime.interpreter as tflite
+    OpResolverType = getattr(tflite, "OpResolverType", None)
+except ImportError:
+    try:
+        import tensorflow.lite as tflite
+        OpResolverType = getattr(tflite.experimental, "OpResolverType", None)
+    except ImportError:
+        raise ImportError("Neither tflite_runtime nor tensorflow is installed.")
+
+TUNING_CACHE = os.path.join(os.environ.get("XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache")),
+                            "sign2speech", "interpreter_tuning.json")
+_tuning_lock = threading.Lock() # Serializes read-modify-write of the tuning cache
+
+
+def is_quantized(detail):
+    """True if a tensor (from get_input_details/get_output_details) holds quantized integers."""
+    scale, _ = detail['quantization']
+    return scale != 0 and np.issubdtype(detail['dtype'], np.integer)
+
+def quantize(values, detail, out=None):
+    """
+    Convert float values to the tensor's integer representation: q = round(x / scale) + zero_point.
+
+    Args:
+        values (np.ndarray): Float values. Modified in place when it is a float32 scratch buffer
+            and `out` is given, to avoid temporaries on the per-frame path.
+        detail (dict): Tensor details with 'quantization' and 'dtype'.
+        out (np.ndarray): Optional integer destination, e.g. an interpreter tensor view.
+
+    Returns:
+        np.ndarray: Quantized values.
+    """
+    scale, zero_point = detail['quantization']
+    info = np.iinfo(detail['dtype'])
+
+    if out is not None and values.dtype == np.float32:
+        scratch = values
+    else:
+        scratch = np.array(values, dtype=np.float32)
+
+    np.multiply(scratch, 1.0 / scale, out=scratch)
+    np.rint(scratch, out=scratch)
+    np.add(scratch, zero_point, out=scratch)
+    np.clip(scratch, info.min, info.max, out=scratch)
+
+    if out is None:
+        return scratch.astype(detail['dtype'])
+    out[...] = scratch
+    return out
+
+def dequantize(values, detail, out=None):
+    """
+    Convert a tensor's integer values back to float: x = (q - zero_point) * scale.
+    Float tensors are returned unchanged.
+
+    Args:
+        out (np.ndarray): Optional float32 destination, to avoid temporaries on the per-frame path.
+    """
+    if not is_quantized(detail):
+        return values
+    scale, zero_point = detail['quantization']
+    if out is None:
+        return (values.astype(np.float32) - zero_point) * scale
+    np.subtract(values, zero_point, out=out, dtype=np.float32) # Not in the integer type, which would wrap
+    np.multiply(out, scale, out=out)
+    return out
+
+
+def create_interpreter(model_path, num_threads=None, use_xnnpack=True, autotune=False, cache_path=TUNING_CACHE):
+    """
+    Create an Interpreter with the given threading/delegate settings.
+
+    Args:
+        model_path (str): Path to the .tflite model.
+        num_threads (int): Interpreter threads (None = runtime default).
+        use_xnnpack (bool): Keep the default XNNPACK CPU delegate enabled.
+        autotune (bool): Ignore num_threads/use_xnnpack and use the fastest configuration
+            for this model and CPU, measured once and cached in cache_path.
+
+    Returns:
+        Interpreter: Interpreter with tensors allocated.
+    """
+    if autotune:
+        config = tuned_config(model_path, cache_path)
+        num_threads, use_xnnpack = config["num_threads"], config["use_xnnpack"]
+
+    kwargs = {"model_path": model_path}
+    if num_threads:
+        kwargs["num_threads"] = num_threads
+    if not use_xnnpack:
+        if OpResolverType is None:
+            print("Warning: this TFLite runtime cannot disable XNNPACK; using defaults.")
+        else:
+            kwargs["experimental_op_resolver_type"] = OpResolverType.BUILTIN_WITHOUT_DEFAULT_DELEGATES
+
+    interpreter = tflite.Interpreter(**kwargs)
+    interpreter.allocate_tensors()
+    return interpreter
+
+def cpu_signature():
+    """Identify the host CPU so tuned settings are not reused on different hardware."""
+    model = ""
+    try:
+        with open("/proc/cpuinfo") as f:
+            for line in f:
+                if line.startswith(("model name", "Model", "Hardware")):
+                    model = line.split(":", 1)[1].strip()
+                    break
+    except OSError:
+        model = platform.processor()
+    return f"{platform.machine()}|{os.cpu_count()}|{model}"
+
+def _cache_key(model_path):
+    with open(model_path, "rb") as f:
+        model_hash = hashlib.sha256(f.read()).hexdigest()[:16]
+    cpu_hash = hashlib.sha256(cpu_signature().encode()).hexdigest()[:16]
+    return f"{model_hash}:{cpu_hash}"
+
+def tuned_config(model_path, cache_path=TUNING_CACHE):
+    """
+    Return the fastest {num_threads, use_xnnpack} for this model on this host,
+    running a short timed sweep only if the result is not cached yet.
+    """
+    key = _cache_key(model_path)
+    with _tuning_lock:
+        cached = _read_tuning_cache(cache_path).get(key)
+    if cached:
+        return cached
+
+    config = autotune_interpreter(model_path)
+    with _tuning_lock:
+        # Re-read so entries written by other tuners since the first read are kept
+        cache = _read_tuning_cache(cache_path)
+        cache[key] = config
+        try:
+            directory = os.path.dirname(cache_path)
+            os.makedirs(directory, exist_ok=True)
+            # Write a temp file and rename it over the cache, so readers never see a partial file
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tuning-", suffix=".json")
+            try:
+                with os.fdopen(fd, "w") as f:
+                    json.dump(cache, f, indent=2)
+                os.replace(tmp_path, cache_path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except OSError as e:
+            print(f"Warning: could not write tuning cache {cache_path}: {e}")
+    return config
+
+def _read_tuning_cache(cache_path):
+    try:
+        with open(cache_path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def autotune_interpreter(model_path, runs=30):
+    """
+    Time candidate configurations on dummy input and return the fastest.
+
+    Returns:
+        dict: {"num_threads": int, "use_xnnpack": bool, "invoke_ms": float}
+    """
+    cpus = os.cpu_count() or 1
+    thread_counts = sorted({n for n in (1, 2, 4, cpus) if n <= cpus})
+    xnnpack_options = (True, False) if OpResolverType is not None else (True,)
+
+    best = None
+    for use_xnnpack in xnnpack_options:
+        for num_threads in thread_counts:
+            interpreter = create_interpreter(model_path, num_threads=num_threads, use_xnnpack=use_xnnpack)
+            for detail in interpreter.get_input_details():
+                interpreter.set_tensor(detail['index'], np.zeros(detail['shape'], dtype=detail['dtype']))
+
+            for _ in range(3): # Warm up
+                interpreter.invoke()
+            samples = []
+            for _ in range(runs):
+                start = time.perf_counter()
+                interpreter.invoke()
+                samples.append(time.perf_counter() - start)
+            invoke_ms = sorted(samples)[len(samples) // 2] * 1000.0
+
+            print(f"  autotune {os.path.basename(model_path)}: threads={num_threads} xnnpack={use_xnnpack} -> {invoke_ms:.3f} ms")
+            if best is None or invoke_ms < best["invoke_ms"]:
+                best = {"num_threads": num_threads, "use_xnnpack": use_xnnpack, "invoke_ms": round(invoke_ms, 4)}
+
+    print(f"Selected threads={best['num_threads']} xnnpack={best['use_xnnpack']} for {model_path}")
+    return best
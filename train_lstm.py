@@ -1,13 +1,16 @@
 import os
+import argparse
 import numpy as np
 import tensorflow as tf
-from tensorflow.keras.models import Sequential
-from tensorflow.keras.layers import LSTM, Dense
+from tensorflow.keras.models import Sequential, Model
+from tensorflow.keras.layers import LSTM, LSTMCell, Dense, Input, Concatenate
 from tensorflow.keras.utils import to_categorical
 
 PROCESSED_PATH = os.path.join("data", "processed")
 SEQUENCE_LENGTH = 30 # Fixed length for input sequences
 MODEL_PATH = "lstm_model.tflite"
+STREAM_MODEL_PATH = "lstm_stream.tflite" # Single-timestep model with explicit LSTM state
+KERAS_MODEL_PATH = "lstm_model.keras" # Trained weights, kept so models can be re-exported
 
 def load_data():
     sequences = []
@@ -53,7 +56,131 @@ def load_data():
     
     return X, y, actions
 
-def train_model():
+def build_streaming_model(model):
+    """
+    Build a single-timestep copy of the trained model that carries LSTM state explicitly.
+
+    Inputs are one landmark frame (1, 63) and the packed state (1, 2*u1 + 2*u2)
+    holding [h1, c1, h2, c2]. Outputs are the class probabilities and the
+    updated state. Running it over a zeroed state for 30 frames reproduces
+    the windowed model's output for that window.
+    """
+    lstm1, lstm2 = model.layers[0], model.layers[1]
+    u1, u2 = lstm1.units, lstm2.units
+
+    frame = Input(shape=(63,), batch_size=1, name="frame")
+    state = Input(shape=(2 * u1 + 2 * u2,), batch_size=1, name="state")
+
+    # Unpack [h1, c1, h2, c2]
+    h1 = state[:, :u1]
+    c1 = state[:, u1:2 * u1]
+    h2 = state[:, 2 * u1:2 * u1 + u2]
+    c2 = state[:, 2 * u1 + u2:]
+
+    # Fresh cells (layer names must be unique) carrying the trained LSTM weights
+    cells = []
+    for i, lstm in enumerate((lstm1, lstm2)):
+        config = lstm.cell.get_config()
+        config["name"] = f"lstm_step_{i + 1}"
+        cells.append(LSTMCell.from_config(config))
+
+    x, (h1_new, c1_new) = cells[0](frame, [h1, c1])
+    x, (h2_new, c2_new) = cells[1](x, [h2, c2])
+    for layer in model.layers[2:]:
+        x = layer(x) # Dense layers are shared with the trained model
+
+    for cell, lstm in zip(cells, (lstm1, lstm2)):
+        cell.set_weights(lstm.cell.get_weights())
+
+    new_state = Concatenate(name="new_state")([h1_new, c1_new, h2_new, c2_new])
+    return Model(inputs=[frame, state], outputs=[x, new_state])
+
+def calibration_sample(X, limit, seed=0):
+    """
+    A random draw of up to `limit` windows. load_data returns X sorted by class,
+    so taking the first windows would calibrate on only the first few classes.
+    """
+    return X[np.random.default_rng(seed).permutation(len(X))[:limit]]
+
+def representative_windows(X, limit=300):
+    """Calibration data for the windowed model: real (1, 30, 63) windows from data/processed."""
+    def generator():
+        for window in calibration_sample(X, limit):
+            yield [window[np.newaxis].astype(np.float32)]
+    return generator
+
+def representative_steps(stream_model, X, limit=100):
+    """
+    Calibration data for the streaming model: (frame, state) pairs as seen at runtime,
+    produced by stepping the float model over real windows.
+    """
+    state_size = stream_model.inputs[1].shape[-1]
+    def generator():
+        for window in calibration_sample(X, limit):
+            state = np.zeros((1, state_size), dtype=np.float32)
+            for frame in window:
+                frame = frame[np.newaxis].astype(np.float32)
+                # Keyed by input name: the converter does not guarantee input order
+                yield {"frame": frame, "state": state}
+                _, state = stream_model([frame, state])
+                state = np.asarray(state, dtype=np.float32)
+    return generator
+
+def convert(converter, quantization="dynamic", representative_data=None):
+    """
+    Convert with the requested quantization.
+
+    Args:
+        converter (tf.lite.TFLiteConverter): Converter for the source model.
+        quantization (str): 'float' (none), 'dynamic' (dynamic-range weights) or
+            'int8' (full integer, calibrated on representative_data).
+        representative_data (callable): Generator of input lists, required for 'int8'.
+
+    Returns:
+        bytes: The TFLite flatbuffer.
+    """
+    if quantization in ("dynamic", "int8"):
+        # Enable optimizations for size
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+
+    if quantization == "int8":
+        converter.representative_dataset = representative_data
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+        converter.inference_input_type = tf.int8
+        converter.inference_output_type = tf.int8
+    else:
+        # With unroll=True (or single-step cells), we should be able to convert using standard TFLite ops
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS]
+    
+    return converter.convert()
+
+def export_tflite(model, path, quantization="dynamic", representative_data=None):
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    tflite_model = convert(converter, quantization, representative_data)
+    
+    with open(path, "wb") as f:
+        f.write(tflite_model)
+    
+    print(f"Model saved to {path} ({quantization}, {len(tflite_model) / 1024:.1f} KB)")
+
+def export_models(model, X, quantization="dynamic", variants=False):
+    """
+    Export the windowed and streaming models.
+
+    Args:
+        X (np.ndarray): Training windows, used to calibrate int8 models.
+        variants (bool): Also write lstm_model_{float,dynamic,int8}.tflite for comparison.
+    """
+    stream_model = build_streaming_model(model)
+    export_tflite(model, MODEL_PATH, quantization, representative_windows(X))
+    export_tflite(stream_model, STREAM_MODEL_PATH, quantization, representative_steps(stream_model, X))
+
+    if variants:
+        for variant in ("float", "dynamic", "int8"):
+            path = MODEL_PATH.replace(".tflite", f"_{variant}.tflite")
+            export_tflite(model, path, variant, representative_windows(X))
+
+def train_model(quantization="dynamic", variants=False):
     X, y, actions = load_data()
     if X is None: return
     
@@ -74,21 +201,10 @@ def train_model():
     model.fit(X, y, epochs=200, callbacks=[tf.keras.callbacks.EarlyStopping(patience=20, restore_best_weights=True)])
     
     model.summary()
+    model.save(KERAS_MODEL_PATH)
     
     # Save as TFLite
-    converter = tf.lite.TFLiteConverter.from_keras_model(model)
-    # Enable optimizations for size
-    converter.optimizations = [tf.lite.Optimize.DEFAULT]
-    
-    # With unroll=True, we should be able to convert using standard TFLite ops
-    converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS]
-    
-    tflite_model = converter.convert()
-    
-    with open(MODEL_PATH, "wb") as f:
-        f.write(tflite_model)
-    
-    print(f"Model saved to {MODEL_PATH}")
+    export_models(model, X, quantization, variants)
     
     # Save labels for inference
     with open("labels.txt", "w") as f:
@@ -96,4 +212,15 @@ def train_model():
             f.write(action + "\n")
 
 if __name__ == "__main__":
-    train_model()
+    parser = argparse.ArgumentParser(description="Train the whole-word LSTM and export TFLite models")
+    parser.add_argument("--export-only", action="store_true", help=f"Skip training and re-export from {KERAS_MODEL_PATH}")
+    parser.add_argument("--quantize", choices=["float", "dynamic", "int8"], default="dynamic",
+                        help="Quantization of the exported models; int8 is calibrated on data/processed")
+    parser.add_argument("--variants", action="store_true", help="Also export float/dynamic/int8 copies for bench_quantization.py")
+    args = parser.parse_args()
+
+    if args.export_only:
+        X, _, _ = load_data()
+        export_models(tf.keras.models.load_model(KERAS_MODEL_PATH), X, args.quantize, args.variants)
+    else:
+        train_model(args.quantize, args.variants)
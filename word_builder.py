@@ -1,21 +1,54 @@
 import time
 
+from lexicon import Lexicon, DEFAULT_VOCABULARY
+
 class WordBuilder:
     """
     Manages the logic for stabilizing recognized letters and forming words.
+
+    Confirmed letters narrow a prefix range in the lexicon, so matching costs a
+    couple of binary searches per letter however large the word list is. A word
+    is accepted as soon as the spelled prefix matches only that word, or when
+    the user pauses after spelling a complete word.
     """
-    def __init__(self, stability_duration=1.0):
+    def __init__(self, stability_duration=1.0, lexicon=None, min_prefix=2, commit_delay=2.5):
         """
         Initialize the word builder.
         
         Args:
             stability_duration (float): Time in seconds a letter must be held to be accepted.
+            lexicon (Lexicon): Words to match; defaults to a small built-in vocabulary.
+            min_prefix (int): Letters needed before an unambiguous prefix is accepted early.
+            commit_delay (float): Seconds without a new letter after which a spelled
+                word that is also the prefix of longer words is accepted.
         """
         self.stability_duration = stability_duration
         self.current_word = ""
         self.last_letter = None
         self.stable_start_time = 0
-        self.vocabulary = {"HELLO", "HI", "YES", "NO", "HELP"}
+        self.lexicon = lexicon if lexicon is not None else Lexicon(DEFAULT_VOCABULARY)
+        self.min_prefix = min_prefix
+        self.commit_delay = commit_delay
+        self.range = (0, len(self.lexicon)) # Lexicon words starting with current_word
+        self.last_confirm_time = 0
+
+    @property
+    def vocabulary(self):
+        """frozenset: The lexicon's words, upper-case. Read-only; use add_words() to extend it."""
+        return frozenset(self.lexicon.words)
+
+    def add_words(self, words):
+        """
+        Add words to the lexicon, ranked as less frequent than every existing word.
+
+        Args:
+            words (list): Words to add. Case is ignored; non A-Z words are skipped.
+        """
+        words = list(words)
+        first = int(self.lexicon.ranks.max()) + 1 if len(self.lexicon) else 0
+        self.lexicon = Lexicon(self.lexicon.words + words,
+                               list(self.lexicon.ranks) + list(range(first, first + len(words))))
+        self.range = self.lexicon.narrow(self.current_word)
 
     def process_letter(self, letter):
         """
@@ -47,6 +80,8 @@ class WordBuilder:
                 # To prevent rapid fire of same letter once stable, we verify we haven't just consumed it.
                 # A simple way is to force a reset of state after acceptance.
                 self.current_word += letter
+                self.range = self.lexicon.narrow(self.current_word, *self.range)
+                self.last_confirm_time = current_time
                 self.last_letter = None # Reset so user has to sign again or hold again
                 self.stable_start_time = 0 
                 return letter
@@ -59,16 +94,33 @@ class WordBuilder:
 
     def check_word(self):
         """
-        Check if the current buffer matches any vocabulary word.
+        Check if the current buffer identifies a lexicon word. Cheap enough to call every frame.
         
         Returns:
             str: The matched word if found, else None.
         """
-        if self.current_word in self.vocabulary:
+        if not self.current_word:
+            return None
+        lo, hi = self.range
+        exact = lo < hi and self.lexicon.words[lo] == self.current_word
+        paused = time.time() - self.last_confirm_time >= self.commit_delay
+
+        if hi - lo == 1 and (exact or len(self.current_word) >= self.min_prefix):
+            matched_word = self.lexicon.words[lo] # Only one word left: accept it early
+        elif exact and paused:
             matched_word = self.current_word
-            self.clear() # Clear buffer on match
-            return matched_word
-        return None
+        else:
+            if lo == hi and paused:
+                self.clear() # Nothing starts with this; most likely a misread letter
+            return None
+        self.clear() # Clear buffer on match
+        return matched_word
+
+    def completions(self, k=3):
+        """Most frequent lexicon words starting with the current buffer."""
+        if not self.current_word:
+            return []
+        return self.lexicon.completions(*self.range, k=k)
 
     def get_current_word(self):
         """Get the current word buffer."""
@@ -77,3 +129,4 @@ class WordBuilder:
     def clear(self):
         """Clear the word buffer."""
         self.current_word = ""
+        self.range = (0, len(self.lexicon))